@@ -4,8 +4,15 @@ from alpaca.trading.requests import MarketOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockLatestQuoteRequest
+import asyncio
+import threading
 import os
 
+import aiohttp
+
+PAPER_BASE_URL = "https://paper-api.alpaca.markets"
+LIVE_BASE_URL = "https://api.alpaca.markets"
+
 class AlpacaMCP:
     def __init__(self, api_key, secret_key, paper=True):
         self.api_key = api_key
@@ -22,6 +29,100 @@ class AlpacaMCP:
             api_key, secret_key
         )
 
+        # Async REST path: one pooled keep-alive aiohttp session, owned by a
+        # private event loop thread so sync callers can use it too
+        self.base_url = PAPER_BASE_URL if paper else LIVE_BASE_URL
+        self._headers = {
+            "APCA-API-KEY-ID": api_key,
+            "APCA-API-SECRET-KEY": secret_key,
+        }
+        self._session = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _run(self, coro):
+        """Run a coroutine on the MCP event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _run_async(self, coro):
+        """Await a coroutine on the MCP event loop from any other loop"""
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        )
+
+    def close(self):
+        """Close the pooled session and stop the MCP event loop thread"""
+        if self._loop.is_closed():
+            return
+        if self._session is not None and not self._session.closed:
+            self._run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Only ever awaited on self._loop: the session is bound to that loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                base_url=self.base_url,
+                headers=self._headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
+    async def get_account_async(self):
+        """Get account info (async, pooled connection)"""
+        return await self._run_async(self._fetch_account())
+
+    async def get_all_positions_async(self):
+        """Get all positions (async, pooled connection)"""
+        return await self._run_async(self._fetch_positions())
+
+    async def _fetch_account(self):
+        try:
+            session = await self._get_session()
+            async with session.get("/v2/account") as resp:
+                resp.raise_for_status()
+                account = await resp.json()
+            return {
+                'success': True,
+                'equity': float(account['equity']),
+                'cash': float(account['cash']),
+                'buying_power': float(account['buying_power'])
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    async def _fetch_positions(self):
+        try:
+            session = await self._get_session()
+            async with session.get("/v2/positions") as resp:
+                resp.raise_for_status()
+                positions = await resp.json()
+            return [
+                {
+                    'symbol': pos['symbol'],
+                    'qty': float(pos['qty']),
+                    'market_value': float(pos['market_value']),
+                    'unrealized_pl': float(pos['unrealized_pl']),
+                    'avg_entry_price': float(pos['avg_entry_price'])
+                }
+                for pos in positions
+            ]
+        except Exception as e:
+            return []
+
+    async def _fetch_account_and_positions(self):
+        return await asyncio.gather(self._fetch_account(), self._fetch_positions())
+
+    def get_account_and_positions(self):
+        """Fetch account and positions concurrently → (account, positions)"""
+        account, positions = self._run(self._fetch_account_and_positions())
+        return account, positions
+
     def get_account(self):
         """Get account info"""
         try:
@@ -106,3 +207,50 @@ class AlpacaMCP:
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
+
+    async def _submit_order_async(self, order):
+        """Submit one market order over the pooled session"""
+        try:
+            qty = float(order.get('qty', 0))
+            side = str(order.get('side', '')).lower()
+            if qty <= 0:
+                return {'success': False, 'error': 'Invalid quantity'}
+            if side not in ('buy', 'sell'):
+                return {'success': False, 'error': f"Invalid side: {side}"}
+
+            payload = {
+                'symbol': str(order['symbol']).upper(),
+                'qty': str(qty),
+                'side': side,
+                'type': 'market',
+                'time_in_force': 'day'
+            }
+            session = await self._get_session()
+            async with session.post("/v2/orders", json=payload) as resp:
+                data = await resp.json()
+                if resp.status >= 400:
+                    return {'success': False, 'error': data.get('message', str(data))}
+
+            return {
+                'success': True,
+                'order_id': str(data['id']),
+                'symbol': data['symbol'],
+                'qty': float(data['qty']),
+                'status': str(data['status']),
+                'submitted': str(data['submitted_at'])
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    async def submit_orders(self, orders):
+        """
+        Submit several market orders concurrently.
+        orders: [{'symbol': 'AAPL', 'qty': 10, 'side': 'buy'}, ...]
+        Returns one result dict per order, in the same order.
+        """
+        return await self._run_async(self._submit_orders(orders))
+
+    async def _submit_orders(self, orders):
+        return list(await asyncio.gather(
+            *[self._submit_order_async(o) for o in orders]
+        ))
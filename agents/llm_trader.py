@@ -1,10 +1,14 @@
 """AI-Powered Trading Agent with Groq LLM"""
 import os
 import re
+import asyncio
 import json
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 # Load .env BEFORE Groq import
 try:
     from dotenv import load_dotenv
@@ -14,11 +18,221 @@ try:
 except Exception as e:
     print(f"⚠️ Could not load .env: {e}")
 
+import httpx
 from groq import Groq
 
+# Optional local embedding model for the semantic command cache
+try:
+    from sentence_transformers import SentenceTransformer
+except Exception:
+    SentenceTransformer = None
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_HIT_THRESHOLD = 0.92  # reuse cached decision, skip Groq
+# Only read-only decisions are replayed from the cache; a near-duplicate of a
+# cached buy/sell ("buy 10 AAPL" vs "buy 100 AAPL") is re-checked with Groq
+SEMANTIC_REPLAY_ACTIONS = ("status", "hold")
+SEMANTIC_CACHE_SIZE = 1024
+
+# Max concurrent Groq requests in process_commands (stays under TPM limits)
+BATCH_CONCURRENCY = 8
+
+# Regex fast path for well-formed commands ("buy 10 AAPL", "sell 5 TSLA").
+# Anchored: only a whole command of exactly this shape skips Groq, so chat
+# like "don't buy 5 TSLA" or "buy 10 shares of apple" still reaches the LLM.
+_BUY_RE = re.compile(r'^\s*buy\s+(\d+(?:\.\d+)?)\s+([a-z]{1,5})\s*$')
+_SELL_RE = re.compile(r'^\s*sell\s+(\d+(?:\.\d+)?)\s+([a-z]{1,5})\s*$')
+# Mechanical command table, tried in order before any LLM call; every entry
+# must be anchored to the whole command (matched with .match, not .search)
+_COMMAND_PATTERNS = ((_BUY_RE, "buy"), (_SELL_RE, "sell"))
+# Lenient offline / LLM-error fallback: "buy 10 aapl" anywhere in the text
+_FALLBACK_PATTERNS = (
+    (re.compile(r'buy\s+(\d+(?:\.\d+)?)\s+([a-z]+)'), "buy"),
+    (re.compile(r'sell\s+(\d+(?:\.\d+)?)\s+([a-z]+)'), "sell"),
+)
+# Markdown code fences around LLM JSON ("```json ... ```")
+_MD_FENCE_RE = re.compile(r'```(?:json)?\n?|```')
+
+# Groq model tiers: one-shot JSON extraction fits the small, fast model;
+# the larger one is only used when the small one still returns invalid
+# JSON after INSTANT_RETRIES retries.
+SPEED_MAP = {
+    "instant": "llama-3.1-8b-instant",
+    "balanced": "llama-3.3-70b-versatile",
+}
+INSTANT_RETRIES = 1
+
+# Static instructions + few-shot examples (~1,000 tokens, roughly the size
+# at which providers start caching prompt prefixes). Kept byte-identical
+# across calls so a cached prefix can be reused; all per-request values go
+# in the user message.
+SYSTEM_PREFIX = """You are a trading assistant for an Alpaca paper trading account.
+You read one natural-language command from the user, together with a short
+summary of the account, and turn it into exactly one trading decision.
+
+Respond ONLY with valid JSON (no markdown, no code blocks):
+{
+    "action": "buy",
+    "symbol": "AAPL",
+    "quantity": 10,
+    "reasoning": "Buying because..."
+}
+
+Valid actions: buy, sell, status, hold
+
+Rules:
+- "action" must be one of: buy, sell, status, hold.
+- "symbol" is the uppercase US stock ticker (for example AAPL, TSLA, MSFT,
+  NVDA, AMZN, GOOGL, META). Map company names to tickers ("apple" -> AAPL,
+  "tesla" -> TSLA, "microsoft" -> MSFT, "nvidia" -> NVDA, "amazon" -> AMZN,
+  "google" or "alphabet" -> GOOGL, "facebook" or "meta" -> META).
+- "quantity" is a positive number of shares. Convert words to numbers
+  ("ten" -> 10, "a couple" -> 2, "a dozen" -> 12). If the user does not
+  give a quantity for a buy or sell, use 1.
+- For questions about balance, equity, cash, buying power, holdings or
+  positions, use "status" and omit symbol and quantity.
+- If the command is unclear, unsafe, or not about trading, use "hold".
+- Never invent a ticker the user did not mention or clearly imply.
+- Never exceed the available cash shown in the account summary for a buy.
+- "reasoning" is one short sentence explaining the decision.
+- Output a single JSON object and nothing else.
+
+Examples:
+
+User command: "buy 10 AAPL"
+{"action": "buy", "symbol": "AAPL", "quantity": 10, "reasoning": "User asked to buy 10 shares of AAPL."}
+
+User command: "Buy ten shares of apple"
+{"action": "buy", "symbol": "AAPL", "quantity": 10, "reasoning": "User asked to buy 10 shares of Apple (AAPL)."}
+
+User command: "sell 5 TSLA"
+{"action": "sell", "symbol": "TSLA", "quantity": 5, "reasoning": "User asked to sell 5 shares of TSLA."}
+
+User command: "dump a couple of my tesla shares"
+{"action": "sell", "symbol": "TSLA", "quantity": 2, "reasoning": "User asked to sell 2 shares of Tesla (TSLA)."}
+
+User command: "pick up some nvidia"
+{"action": "buy", "symbol": "NVDA", "quantity": 1, "reasoning": "No quantity given, buying 1 share of NVDA."}
+
+User command: "get me a dozen microsoft"
+{"action": "buy", "symbol": "MSFT", "quantity": 12, "reasoning": "User asked to buy 12 shares of Microsoft (MSFT)."}
+
+User command: "exit 3 amazon"
+{"action": "sell", "symbol": "AMZN", "quantity": 3, "reasoning": "User asked to sell 3 shares of Amazon (AMZN)."}
+
+User command: "I want to own 25 more GOOGL"
+{"action": "buy", "symbol": "GOOGL", "quantity": 25, "reasoning": "User asked to buy 25 shares of GOOGL."}
+
+User command: "close out 4 shares of meta"
+{"action": "sell", "symbol": "META", "quantity": 4, "reasoning": "User asked to sell 4 shares of Meta (META)."}
+
+User command: "buy 2.5 msft"
+{"action": "buy", "symbol": "MSFT", "quantity": 2.5, "reasoning": "User asked to buy 2.5 shares of MSFT."}
+
+User command: "take profits on 15 nvda"
+{"action": "sell", "symbol": "NVDA", "quantity": 15, "reasoning": "User asked to sell 15 shares of NVDA to take profits."}
+
+User command: "What's my trading balance?"
+{"action": "status", "reasoning": "User asked for account balance."}
+
+User command: "Show my positions"
+{"action": "status", "reasoning": "User asked to see open positions."}
+
+User command: "how much buying power do I have left"
+{"action": "status", "reasoning": "User asked for buying power."}
+
+User command: "Portfolio status?"
+{"action": "status", "reasoning": "User asked for portfolio status."}
+
+User command: "should I buy something?"
+{"action": "hold", "reasoning": "No specific trade requested."}
+
+User command: "what's the weather like"
+{"action": "hold", "reasoning": "Command is not about trading."}
+
+User command: "buy everything"
+{"action": "hold", "reasoning": "Request is unclear and unsafe to execute."}
+
+User command: "wait for now"
+{"action": "hold", "reasoning": "User asked to hold."}
+
+The account summary and the user command follow in the next message.
+"""
+
+
+_JSON_DECODER = json.JSONDecoder()
+VALID_ACTIONS = ("buy", "sell", "status", "hold")
+
+
+def _decode_json_object(text: str, idx: int) -> Optional[Dict[str, Any]]:
+    """
+    Decode the JSON object starting at text[idx], ignoring what follows.
+    Only an object with a valid "action" counts as a decision.
+    """
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text, idx)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(obj, dict) and obj.get("action") in VALID_ACTIONS:
+        return obj
+    return None
+
+
+class _SemanticCache:
+    """
+    LRU cache of parsed LLM decisions keyed by L2-normalized command
+    embeddings. Lookup is a single matrix-vector dot product (cosine).
+    Shared by every session using the trader, so access is locked.
+    """
+
+    def __init__(self, dim: int, capacity: int = SEMANTIC_CACHE_SIZE):
+        self.capacity = capacity
+        self._emb = np.zeros((capacity, dim), dtype=np.float32)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._decisions: List[Dict[str, Any]] = []
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, emb: np.ndarray) -> Tuple[float, Optional[Dict[str, Any]]]:
+        """Return (best cosine score, cached decision) for the nearest entry"""
+        with self._lock:
+            n = len(self._decisions)
+            if n == 0:
+                return 0.0, None
+            scores = self._emb[:n] @ emb
+            idx = int(np.argmax(scores))
+            score = float(scores[idx])
+            if score > SEMANTIC_HIT_THRESHOLD:
+                self._tick += 1
+                self._last_used[idx] = self._tick
+            return score, dict(self._decisions[idx])
+
+    def store(self, emb: np.ndarray, decision: Dict[str, Any]) -> None:
+        """Insert a decision, evicting the least recently used row when full"""
+        with self._lock:
+            n = len(self._decisions)
+            if n < self.capacity:
+                idx = n
+                self._decisions.append(dict(decision))
+            else:
+                idx = int(np.argmin(self._last_used))
+                self._decisions[idx] = dict(decision)
+            self._tick += 1
+            self._emb[idx] = emb
+            self._last_used[idx] = self._tick
+
+
 class LLMTrader:
     def __init__(self, alpaca_mcp):
         self.mcp = alpaca_mcp
+        self.model = SPEED_MAP["instant"]
+
+        # Semantic cache: near-duplicate commands reuse the prior decision.
+        # The embedding model is loaded (and downloaded) on first use, not here.
+        self.embedder = None
+        self.cache = None
+        self._embedder_loaded = SentenceTransformer is None
+        self._embedder_lock = threading.Lock()
 
         # Get Groq API key with validation
         groq_key = os.getenv('GROQ_API_KEY')
@@ -28,104 +242,276 @@ class LLMTrader:
             self.client = None
         else:
             try:
-                self.client = Groq(api_key=groq_key)
+                self.client = Groq(api_key=groq_key, http_client=self._make_http_client())
                 print(f"✅ Groq AI initialized: {groq_key[:10]}...")
             except Exception as e:
                 print(f"❌ Groq initialization failed: {e}")
                 self.client = None
 
+    @staticmethod
+    def _make_http_client() -> httpx.Client:
+        """Pooled keep-alive client for Groq; HTTP/2 when `h2` is installed"""
+        limits = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        timeout = httpx.Timeout(30.0)
+        try:
+            return httpx.Client(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            return httpx.Client(limits=limits, timeout=timeout)
+
+    def _load_embedder(self) -> None:
+        """Load the embedding model and cache once, on the first lookup"""
+        with self._embedder_lock:
+            if self._embedder_loaded:
+                return
+            try:
+                self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+                self.cache = _SemanticCache(
+                    self.embedder.get_sentence_embedding_dimension()
+                )
+            except Exception as e:
+                print(f"⚠️ Semantic cache disabled: {e}")
+                self.embedder = None
+            self._embedder_loaded = True
+
+    def _embed(self, command: str) -> Optional[np.ndarray]:
+        """L2-normalized embedding of the command, or None if unavailable"""
+        if not self._embedder_loaded:
+            self._load_embedder()
+        if self.embedder is None:
+            return None
+        try:
+            emb = self.embedder.encode(command.strip().lower(), normalize_embeddings=True)
+            return np.asarray(emb, dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Embedding failed: {e}")
+            return None
+
     def process_command(self, command: str) -> Dict[str, Any]:
         """Process natural language → trading action"""
 
-        # If no AI client, use regex fallback
+        # Regex first: well-formed buy/sell commands never need Groq, and
+        # without an AI client the lenient regex result is all we have
+        decision = self._quick_decision(command)
+        if decision is not None:
+            return self._execute_decision(decision)
         if not self.client:
             return self._process_with_regex(command)
 
+        # Semantic cache: a direct status/hold hit skips both Alpaca context
+        # calls and Groq. Weaker (gray-zone) matches and buy/sell hits still
+        # go to Groq and are stored below.
+        emb = self._embed(command)
+        cached = self._cached_decision(emb)
+        if cached is not None:
+            return self._execute_decision(cached)
+
         # Get account context for AI
         try:
-            account = self.mcp.get_account()
-            positions = self.mcp.get_all_positions()
+            account, positions = self.mcp.get_account_and_positions()
         except Exception as e:
             return {
                 'success': False,
                 'message': f"Failed to get account data: {str(e)}"
             }
 
-        # AI Prompt
-        prompt = f"""You are a trading assistant. Analyze this command and execute it.
+        try:
+            decision = self._llm_decision(command, account, positions)
+            if decision is None:
+                decision = self._regex_fallback(command)
+            elif emb is not None:
+                self.cache.store(emb, decision)
 
-Account: Equity ${account.get('equity', 0)}, Cash ${account.get('cash', 0)}
-Positions: {len(positions)} open positions
+            return self._execute_decision(decision)
 
-User command: "{command}"
+        except Exception as e:
+            print(f"❌ AI error: {str(e)}, using regex fallback")
+            return self._process_with_regex(command)
 
-Respond ONLY with valid JSON (no markdown, no code blocks):
-{{
-    "action": "buy",
-    "symbol": "AAPL",
-    "quantity": 10,
-    "reasoning": "Buying because..."
-}}
+    async def process_commands(self, commands: List[str], execute: bool = True) -> List[Dict[str, Any]]:
+        """
+        Bulk variant of process_command (e.g. replaying logged commands).
+        Groq calls run concurrently, bounded by BATCH_CONCURRENCY, against a
+        single account/positions snapshot; the decisions are then executed
+        one at a time in input order. With execute=False the parsed
+        decisions are returned instead of being executed.
+        """
+        account, positions = {}, []
+        if self.client:
+            try:
+                account, positions = await asyncio.to_thread(self.mcp.get_account_and_positions)
+            except Exception as e:
+                print(f"⚠️ Failed to get account data: {e}")
 
-Valid actions: buy, sell, status, hold
-"""
+        sem = asyncio.Semaphore(BATCH_CONCURRENCY)
 
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.1-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=200
-            )
+        async def classify(command: str) -> Dict[str, Any]:
+            decision = self._quick_decision(command)
+            if decision is not None:
+                return decision
+            if not self.client:
+                return self._regex_fallback(command)
 
-            ai_response = response.choices[0].message.content.strip()
+            emb = await asyncio.to_thread(self._embed, command)
+            cached = self._cached_decision(emb)
+            if cached is not None:
+                return cached
+            try:
+                async with sem:
+                    ai_decision = await asyncio.to_thread(
+                        self._llm_decision, command, account, positions
+                    )
+                if ai_decision is not None:
+                    if emb is not None:
+                        self.cache.store(emb, ai_decision)
+                    return ai_decision
+            except Exception as e:
+                print(f"❌ AI error: {str(e)}, using regex fallback")
+            return self._regex_fallback(command)
 
-            # Remove markdown code blocks if present
-            ai_response = re.sub(r'``````', '', ai_response)
+        decisions = await asyncio.gather(*[classify(c) for c in commands])
+        if not execute:
+            return list(decisions)
 
-            # Parse AI JSON
-            try:
-                decision = json.loads(ai_response)
-            except json.JSONDecodeError:
-                print(f"⚠️ AI returned invalid JSON: {ai_response[:100]}")
-                decision = self._regex_fallback(command)
+        # Orders go out sequentially so "buy 10 X" then "sell 10 X" keeps its order
+        results = []
+        for decision in decisions:
+            results.append(await asyncio.to_thread(self._execute_decision, decision))
+        return results
 
-            return self._execute_decision(decision)
+    def _cached_decision(self, emb: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Cached status/hold decision for a near-duplicate command, if any"""
+        if emb is None:
+            return None
+        score, cached = self.cache.lookup(emb)
+        if (
+            cached is not None
+            and score > SEMANTIC_HIT_THRESHOLD
+            and cached.get("action") in SEMANTIC_REPLAY_ACTIONS
+        ):
+            return cached
+        return None
 
-        except Exception as e:
-            print(f"❌ AI error: {str(e)}, using regex fallback")
-            return self._process_with_regex(command)
+    def _llm_decision(self, command: str, account: Dict[str, Any], positions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Ask Groq for a decision; retry, then escalate once, on invalid JSON"""
+        # Static prefix first, dynamic values last, so the provider can reuse
+        # the cached prefix across calls
+        user_suffix = f"""Account: Equity ${account.get('equity', 0)}, Cash ${account.get('cash', 0)}
+Positions: {len(positions)} open positions
+
+User command: "{command}"
+"""
+
+        decision = self._ask_llm(self.model, user_suffix)
+        for _ in range(INSTANT_RETRIES):
+            if decision is not None:
+                break
+            decision = self._ask_llm(self.model, user_suffix)
+        if decision is None:
+            # Escalate once to the larger model before giving up on the LLM
+            decision = self._ask_llm(SPEED_MAP["balanced"], user_suffix)
+        return decision
+
+    def _ask_llm(self, model: str, user_suffix: str) -> Optional[Dict[str, Any]]:
+        """
+        Streamed Groq completion → parsed decision, or None on invalid JSON.
+        Stops reading as soon as the first top-level JSON object closes.
+        """
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PREFIX},
+                {"role": "user", "content": user_suffix},
+            ],
+            temperature=0,
+            max_tokens=80,
+            stream=True,
+        )
+
+        buf = ""
+        start = -1
+        depth = 0
+        in_string = escaped = False
+        decision = None
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                offset = len(buf)
+                buf += delta
+                # Track {} depth, ignoring braces inside string literals
+                for i, ch in enumerate(delta, offset):
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = depth > 0
+                    elif ch == "{":
+                        if depth == 0:
+                            start = i
+                        depth += 1
+                    elif ch == "}" and depth > 0:
+                        depth -= 1
+                        if depth == 0:
+                            # Candidate object closed: stop as soon as it decodes
+                            decision = _decode_json_object(buf, start)
+                            if decision is not None:
+                                break
+                if decision is not None:
+                    break
+        finally:
+            response.close()
+
+        if decision is None:
+            # Stream ended without a clean object: strip fences and retry
+            # from every '{', tolerating surrounding prose
+            text = _MD_FENCE_RE.sub('', buf)
+            idx = text.find("{")
+            while decision is None and idx != -1:
+                decision = _decode_json_object(text, idx)
+                idx = text.find("{", idx + 1)
+
+        if decision is None:
+            print(f"⚠️ AI ({model}) returned invalid JSON: {buf[:100]}")
+        return decision
 
     def _process_with_regex(self, command: str) -> Dict[str, Any]:
         """Process command with regex fallback"""
         decision = self._regex_fallback(command)
         return self._execute_decision(decision)
 
+    @staticmethod
+    def _regex_decision(action: str, match: "re.Match") -> Dict[str, Any]:
+        qty, symbol = match.groups()
+        return {
+            "action": action,
+            "symbol": symbol.upper(),
+            "quantity": float(qty),
+            "reasoning": f"Regex parsed {action} command"
+        }
+
+    def _quick_decision(self, command: str) -> Optional[Dict[str, Any]]:
+        """Fast path: decision for a whole-command "buy 10 AAPL", else None"""
+        cmd_lower = command.lower()
+        for pattern, action in _COMMAND_PATTERNS:
+            match = pattern.match(cmd_lower)
+            if match:
+                return self._regex_decision(action, match)
+        return None
+
     def _regex_fallback(self, command: str) -> Dict[str, Any]:
         """Parse command using regex patterns"""
         cmd_lower = command.lower()
 
-        # Buy pattern: "buy 10 AAPL"
-        buy_match = re.search(r'buy\s+(\d+(?:\.\d+)?)\s+([a-z]+)', cmd_lower)
-        if buy_match:
-            qty, symbol = buy_match.groups()
-            return {
-                "action": "buy",
-                "symbol": symbol.upper(),
-                "quantity": float(qty),
-                "reasoning": "Regex parsed buy command"
-            }
-
-        # Sell pattern: "sell 5 TSLA"
-        sell_match = re.search(r'sell\s+(\d+(?:\.\d+)?)\s+([a-z]+)', cmd_lower)
-        if sell_match:
-            qty, symbol = sell_match.groups()
-            return {
-                "action": "sell",
-                "symbol": symbol.upper(),
-                "quantity": float(qty),
-                "reasoning": "Regex parsed sell command"
-            }
+        # "buy 10 AAPL" / "sell 5 TSLA" anywhere in the command
+        for pattern, action in _FALLBACK_PATTERNS:
+            match = pattern.search(cmd_lower)
+            if match:
+                return self._regex_decision(action, match)
 
         # Default to status
         return {
@@ -4,7 +4,7 @@ import datetime as dt
 
 from backend import utils
 from agents_investment.market_generator import step_market
-from .observer import observe
+from .observer import observe_lite
 from .planner import plan
 from .executor import execute
 from .reward import compute_reward
@@ -20,20 +20,24 @@ def run_cycle() -> Dict[str, Any]:
     - compute reward and update NAV history
     """
     timestamp = dt.datetime.utcnow().isoformat()
+    # balance_history key for every write this cycle makes
+    date = utils._date_of(timestamp)
 
     # 1) Market price moves
     step_market()
 
     # 2) Income & expenses (unstable income model)
-    cash_flows = utils.simulate_income_and_expense(timestamp)
+    cash_flows = utils.simulate_income_and_expense(timestamp, date)
 
     # 3) Observe current financial state
-    state = observe()
+    state = observe_lite()
     state.update(cash_flows)
 
     # 4) Planner chooses action
     plan_out = plan(state) or {}
     plan_out["timestamp"] = timestamp
+    plan_out["date"] = date
+    utils.record_sip_suggestion(plan_out.get("suggested_sip", 0.0))
 
     # 5) Executor applies action (invest / repay / save / hold)
     result = execute(plan_out, state) or {}
@@ -41,6 +45,10 @@ def run_cycle() -> Dict[str, Any]:
     # 6) Update NAV history and compute reward
     nav = utils.update_nav_history()
     state["nav"] = nav
+    # state holds a snapshot of nav_history (shared with the core state
+    # cache); bring a copy level with SIM_STATE
+    if "nav_history" in state:
+        state["nav_history"] = state["nav_history"] + [nav]
     reward = compute_reward(state, result)
 
     return {
@@ -49,4 +57,5 @@ def run_cycle() -> Dict[str, Any]:
         "result": result,
         "reward": float(reward),
         "timestamp": timestamp,
+        "date": date,
     }
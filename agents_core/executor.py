@@ -12,7 +12,7 @@ def execute(plan: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
     timestamp = plan.get("timestamp", "")
 
     if action == "invest" and amount > 0.0:
-        return utils.apply_investment(timestamp, mode, ticker, amount)
+        return utils.apply_investment(timestamp, mode, ticker, amount, date=plan.get("date"))
     elif action == "repay":
         # model as an extra expense transaction
         repay_amt = max(0.0, amount)
@@ -21,6 +21,7 @@ def execute(plan: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
             timestamp, "repay", repay_amt, "debt repayment", "expense"
         )
         utils.SIM_STATE["balance_history"].append(utils.SIM_STATE["bank_balance"])
+        utils._invalidate_core_state()
         return {"status": "repaid", "amount": float(repay_amt)}
     elif action == "save":
         return {"status": "saved"}
@@ -1,7 +1,22 @@
 # agents_core/observer.py
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
 
-from backend.utils import get_state
+from backend.utils import get_state, get_core_state
+
+# State fields read downstream in a cycle: planner / SIP logic, reward,
+# the balance persisted with the log, and the Overview insights panel
+CYCLE_FIELDS = (
+    "bank_balance",
+    "monthly_income",
+    "monthly_expense",
+    "income_rate",
+    "expense_rate",
+    "volatility",
+    "emergency_buffer",
+    "emergency_buffer_ok",
+    "risk_profile",
+    "nav_history",
+)
 
 
 def observe() -> Dict[str, Any]:
@@ -9,3 +24,13 @@ def observe() -> Dict[str, Any]:
     Reads the full financial state from backend utils.
     """
     return get_state()
+
+
+def observe_lite(fields: Iterable[str] = CYCLE_FIELDS) -> Dict[str, Any]:
+    """
+    Projection of the financial state onto `fields`. Skips the SIP
+    re-evaluation and cashflow totals that get_state() adds, and keeps the
+    full price history out of the cycle state (and its log row).
+    """
+    core = get_core_state()
+    return {k: core[k] for k in fields if k in core}
@@ -1,8 +1,9 @@
 # agents_investment/investment_agent.py
 from __future__ import annotations
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Sequence, Tuple
 
-from .market_generator import get_price, get_history
+from .market_generator import get_price, get_prices, get_history, get_volatility, get_step
 from .trading_bot import analyze_market, predict_price
 
 
@@ -90,10 +91,11 @@ class Portfolio:
         }
 
     def portfolio_value(self) -> float:
-        total = self.cash
-        for t, units in self.positions.items():
-            p = get_price(t)
-            total += units * p
+        prices = get_prices()
+        index_price = prices["INDEX"]
+        total = self.cash + sum(
+            units * prices.get(t, index_price) for t, units in self.positions.items()
+        )
         return float(total)
 
 
@@ -119,7 +121,7 @@ def sell(ticker: str, amount: float) -> Dict[str, Any]:
 # ---------------- SIP + opportunity logic ---------------- #
 
 
-def _compute_sip(state: Dict[str, Any], history: list[float], profile: str) -> float:
+def _compute_sip(state: Dict[str, Any], history: Sequence[float], profile: str) -> float:
     cfg = risk_config.get(profile, risk_config["balanced"])
 
     cash = float(state.get("bank_balance", state.get("balance", 0.0)))
@@ -144,14 +146,47 @@ def _compute_sip(state: Dict[str, Any], history: list[float], profile: str) -> f
     return max(0.0, float(sip))
 
 
+# Memo of recent evaluate_investment_opportunity results; the output only
+# depends on the market step and the state fields read by _compute_sip
+_OPPORTUNITY_CACHE_SIZE = 8
+_opportunity_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+
+
+def _opportunity_key(state: Dict[str, Any], ticker: str) -> Tuple:
+    return (
+        ticker,
+        get_step(),
+        state.get("risk_profile", "balanced"),
+        state.get("bank_balance", state.get("balance", 0.0)),
+        state.get("monthly_income", state.get("income_rate", 0.0)),
+        state.get("monthly_expense", state.get("expense_rate", 0.0)),
+        state.get("emergency_buffer"),
+        state.get("volatility", 0.0),
+    )
+
+
 def evaluate_investment_opportunity(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Unified decision: combines trading signal, volatility, SIP logic, and risk profile.
     Returns both execution plan and suggested SIP.
     """
     ticker = "INDEX"
+    key = _opportunity_key(state, ticker)
+    cached = _opportunity_cache.get(key)
+    if cached is not None:
+        _opportunity_cache.move_to_end(key)
+        return dict(cached)
+
+    result = _evaluate_investment_opportunity(state, ticker)
+    _opportunity_cache[key] = result
+    if len(_opportunity_cache) > _OPPORTUNITY_CACHE_SIZE:
+        _opportunity_cache.popitem(last=False)
+    return dict(result)
+
+
+def _evaluate_investment_opportunity(state: Dict[str, Any], ticker: str) -> Dict[str, Any]:
     history = get_history(ticker)
-    signal_info = analyze_market(history)
+    signal_info = analyze_market(history, vol=get_volatility(ticker))
     signal = signal_info["signal"]
     confidence = int(signal_info["confidence"])
     vol = float(signal_info["volatility"])
@@ -159,7 +194,7 @@ def evaluate_investment_opportunity(state: Dict[str, Any]) -> Dict[str, Any]:
     cfg = risk_config.get(profile, risk_config["balanced"])
 
     pred_price = predict_price(history)
-    last_price = history[-1] if history else pred_price
+    last_price = float(history[-1]) if len(history) else pred_price
     trend_positive = pred_price > last_price
 
     sip_amount = _compute_sip(state, history, profile)
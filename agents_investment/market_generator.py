@@ -1,15 +1,81 @@
 # agents_investment/market_generator.py
-import math
-import random
-from typing import Dict, List, Tuple
+from collections import deque
+from types import MappingProxyType
+from typing import Deque, Dict, List, Mapping, Tuple
 
-# Simple GBM-based market state
-_state: Dict[str, Dict[str, float | List[float]]] = {
-    # Daily drift ~0.08% (≈ 20% annual), vol ~2% daily (visibly moves)
-    "INDEX": {"price": 100.0, "history": [], "mu": 0.0008, "sigma": 0.02},
-    "STOCK_A": {"price": 60.0, "history": [], "mu": 0.0010, "sigma": 0.03},
-    "STOCK_B": {"price": 140.0, "history": [], "mu": 0.0004, "sigma": 0.025},
-}
+import numpy as np
+
+HISTORY_LEN = 2000
+
+# Simple GBM-based market state, stored as aligned per-ticker arrays (SoA)
+# so one vectorized step advances every ticker.
+# Daily drift ~0.08% (≈ 20% annual), vol ~2% daily (visibly moves)
+_TICKERS: List[str] = ["INDEX", "STOCK_A", "STOCK_B"]
+_TICKER_IDX: Dict[str, int] = {t: i for i, t in enumerate(_TICKERS)}
+_prices = np.array([100.0, 60.0, 140.0])
+_mu = np.array([0.0008, 0.0010, 0.0004])
+_sigma = np.array([0.02, 0.03, 0.025])
+# GBM drift term (mu - 0.5*sigma^2); refreshed whenever sigma changes
+_drift = _mu - 0.5 * _sigma * _sigma
+
+# Plain-float price snapshot, refreshed once per step_market(); prices are
+# constant within a cycle, so valuation reads this instead of the arrays
+_current_prices: Dict[str, float] = dict(zip(_TICKERS, _prices.tolist()))
+# Read-only view handed out by get_prices(); callers cannot mutate market state
+_PRICES_VIEW: Mapping[str, float] = MappingProxyType(_current_prices)
+
+# Ring buffer of the last HISTORY_LEN prices per ticker (oldest dropped in O(1))
+_history: Dict[str, Deque[float]] = {t: deque(maxlen=HISTORY_LEN) for t in _TICKERS}
+
+_rng = np.random.default_rng()
+
+# Preallocated pool of N(0, 1) draws, one row per market step, refilled in
+# a single vectorized call when exhausted
+_Z_POOL_STEPS = 1024
+_z_pool = _rng.standard_normal((_Z_POOL_STEPS, len(_TICKERS)))
+_z_next = 0
+
+# Number of market steps taken so far (cheap "has the market moved" check)
+_steps = 0
+
+
+class _RollingStats:
+    """
+    Welford mean/variance of simple returns over a sliding window.
+    Supports removal, so volatility updates in O(1) per step instead of
+    rescanning the whole history.
+    """
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.n -= 1
+        self.mean = (old_mean * (self.n + 1) - x) / self.n
+        self.m2 = max(0.0, self.m2 - (x - old_mean) * (x - self.mean))
+
+    def std(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return float(np.sqrt(self.m2 / self.n))
+
+
+# Return statistics over each ticker's history window
+_ret_stats: Dict[str, _RollingStats] = {t: _RollingStats() for t in _TICKERS}
 
 
 def set_index_volatility(sigma: float) -> None:
@@ -17,80 +83,98 @@ def set_index_volatility(sigma: float) -> None:
     Clamp INDEX daily volatility to [0.005, 0.05].
     """
     sigma = max(0.005, min(0.05, float(sigma)))
-    _state["INDEX"]["sigma"] = sigma  # type: ignore[assignment]
+    i = _TICKER_IDX["INDEX"]
+    _sigma[i] = sigma
+    _drift[i] = _mu[i] - 0.5 * sigma * sigma
 
 
-def _step_gbm(ticker: str) -> None:
-    """
-    One GBM step: S_{t+1} = S_t * exp((mu - 0.5*sigma^2) + sigma * Z),
-    with Z ~ N(0, 1). [web:100]
+def step_market() -> None:
     """
-    d = _state[ticker]
-    price = float(d["price"])          # type: ignore[arg-type]
-    mu = float(d["mu"])               # type: ignore[arg-type]
-    sigma = float(d["sigma"])         # type: ignore[arg-type]
+    Advance the market by one simulated day.
+    Called once per agent cycle.
 
-    z = random.gauss(0.0, 1.0)
-    log_ret = (mu - 0.5 * sigma ** 2) + sigma * z
-    new_price = price * math.exp(log_ret)
+    One GBM step for all tickers at once:
+    S_{t+1} = S_t * exp((mu - 0.5*sigma^2) + sigma * Z), with Z ~ N(0, 1). [web:100]
+    """
+    global _z_next, _steps
+    if _z_next >= _Z_POOL_STEPS:
+        _rng.standard_normal(out=_z_pool)
+        _z_next = 0
+    z = _z_pool[_z_next]
+    _z_next += 1
+    log_ret = _drift + _sigma * z
+    # S * expm1(x) is the price change, without exp(x) - 1 cancellation
+    change = _prices * np.expm1(log_ret)
+    new_prices = _prices + change
 
     # Ensure strictly positive and never exactly flat
-    if new_price <= 0.0 or abs(new_price - price) < 1e-6:
-        direction = 1.0 if z >= 0 else -1.0
-        new_price = price * (1.0 + 0.003 * direction)
+    bad = (new_prices <= 0.0) | (np.abs(change) < 1e-6)
+    if bad.any():
+        direction = np.where(z[bad] >= 0, 1.0, -1.0)
+        new_prices[bad] = _prices[bad] * (1.0 + 0.003 * direction)
+
+    _prices[:] = new_prices
+    new_list = new_prices.tolist()
+    _current_prices.update(zip(_TICKERS, new_list))
+    for t, p in zip(_TICKERS, new_list):
+        hist = _history[t]
+        stats = _ret_stats[t]
+        if hist:
+            if len(hist) == HISTORY_LEN:
+                # oldest price (and the return it starts) is about to drop
+                stats.remove((hist[1] - hist[0]) / hist[0])
+            stats.add((p - hist[-1]) / hist[-1])
+        hist.append(p)
+
+    # bump last, once the step is fully visible to readers
+    _steps += 1
 
-    d["price"] = new_price
-    history: List[float] = d["history"]  # type: ignore[assignment]
-    history.append(new_price)
-    if len(history) > 2000:
-        history.pop(0)
 
+def get_price(ticker: str) -> float:
+    # Do NOT advance here; stepping is controlled by step_market()
+    price = _current_prices.get(ticker)
+    return _current_prices["INDEX"] if price is None else price
 
-def step_market() -> None:
+
+def get_prices() -> Mapping[str, float]:
     """
-    Advance the market by one simulated day.
-    Called once per agent cycle.
+    Current price of every ticker as a read-only live view (no copy); it
+    reflects the next step_market() too, so copy it to keep a snapshot.
     """
-    for t in _state.keys():
-        _step_gbm(t)
+    return _PRICES_VIEW
 
 
-def get_price(ticker: str) -> float:
-    if ticker not in _state:
+def get_step() -> int:
+    """Number of market steps taken so far."""
+    return _steps
+
+
+def get_history(ticker: str) -> np.ndarray:
+    if ticker not in _history:
         ticker = "INDEX"
-    # Do NOT advance here; stepping is controlled by step_market()
-    return float(_state[ticker]["price"])  # type: ignore[return-value]
+    # snapshot array so callers can't mutate the ring buffer
+    return np.asarray(_history[ticker], dtype=float)
 
 
-def get_history(ticker: str) -> List[float]:
-    if ticker not in _state:
+def get_volatility(ticker: str) -> float:
+    """
+    Realized volatility (population std of simple returns) over the
+    ticker's history window, maintained incrementally by step_market().
+    """
+    if ticker not in _ret_stats:
         ticker = "INDEX"
-    return list(_state[ticker]["history"])  # copy so callers can't mutate
+    return _ret_stats[ticker].std()
 
 
 def _ensure_bootstrap() -> None:
     """
     Guarantee at least 200 historical points so charts are never flat.
     """
-    if not _state["INDEX"]["history"]:
+    if not _history["INDEX"]:
         for _ in range(200):
             step_market()
 
 
-def _realized_volatility(prices: List[float]) -> float:
-    if len(prices) < 2:
-        return 0.0
-    rets = []
-    for i in range(1, len(prices)):
-        if prices[i - 1] > 0:
-            rets.append((prices[i] - prices[i - 1]) / prices[i - 1])
-    if not rets:
-        return 0.0
-    mu = sum(rets) / len(rets)
-    var = sum((r - mu) ** 2 for r in rets) / len(rets)
-    return math.sqrt(var)
-
-
 def get_index_metrics() -> Tuple[List[float], float, float, float]:
     """
     Returns (price_history, current_price, volatility, total_return)
@@ -98,13 +182,14 @@ def get_index_metrics() -> Tuple[List[float], float, float, float]:
     """
     _ensure_bootstrap()
     hist = get_history("INDEX")
-    current = hist[-1] if hist else 100.0
-    vol = _realized_volatility(hist)
+    current = hist[-1] if len(hist) else 100.0
+    vol = get_volatility("INDEX")
     if len(hist) >= 2 and hist[0] > 0:
         total_ret = hist[-1] / hist[0] - 1.0
     else:
         total_ret = 0.0
-    return hist, float(current), float(vol), float(total_ret)
+    # list for the JSON-serialized state / API payloads
+    return hist.tolist(), float(current), float(vol), float(total_ret)
 
 
 # Seed history on import
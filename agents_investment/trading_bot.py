@@ -1,35 +1,38 @@
 # backend/agents_investment/trading_bot.py
 from typing import Dict, List
-import math
+
+import numpy as np
 
 
 def _sma(values: List[float], window: int) -> float | None:
     if len(values) < window:
         return None
-    return sum(values[-window:]) / float(window)
+    return float(np.asarray(values[-window:], dtype=float).mean())
 
 
 def _volatility(values: List[float]) -> float:
     if len(values) < 2:
         return 0.0
-    rets = []
-    for i in range(1, len(values)):
-        if values[i - 1] > 0:
-            rets.append((values[i] - values[i - 1]) / values[i - 1])
-    if not rets:
+    p = np.asarray(values, dtype=float)
+    prev = p[:-1]
+    valid = prev > 0
+    if not valid.any():
         return 0.0
-    mu = sum(rets) / len(rets)
-    var = sum((r - mu) ** 2 for r in rets) / len(rets)
-    return math.sqrt(var)
+    rets = np.diff(p)[valid] / prev[valid]
+    return float(rets.std())
 
 
-def analyze_market(history: List[float]) -> Dict[str, any]:
-    if not history:
+def analyze_market(history: List[float], vol: float | None = None) -> Dict[str, any]:
+    """
+    vol: precomputed volatility of `history` (e.g. the market generator's
+    running estimate); computed from scratch when omitted.
+    """
+    if len(history) == 0:
         return {"signal": "hold", "confidence": 0, "volatility": 0.0}
     short = _sma(history, 5) or history[-1]
     long = _sma(history, 20) or short
     price = history[-1]
-    vol = _volatility(history)
+    vol = _volatility(history) if vol is None else float(vol)
 
     signal = "hold"
     conf = 10
@@ -59,18 +62,19 @@ def analyze_market(history: List[float]) -> Dict[str, any]:
 
 
 def predict_price(history: List[float]) -> float:
-    if not history:
+    if len(history) == 0:
         return 0.0
     if len(history) < 3:
         return float(history[-1])
     # linear trend on last N points
     n = min(10, len(history))
-    ys = history[-n:]
-    xs = list(range(n))
-    mean_x = sum(xs) / n
-    mean_y = sum(ys) / n
-    num = sum((xs[i] - mean_x) * (ys[i] - mean_y) for i in range(n))
-    den = sum((xs[i] - mean_x) ** 2 for i in range(n)) or 1.0
+    ys = np.asarray(history[-n:], dtype=float)
+    xs = np.arange(n, dtype=float)
+    mean_x = xs.mean()
+    mean_y = ys.mean()
+    dx = xs - mean_x
+    num = float(np.dot(dx, ys - mean_y))
+    den = float(np.dot(dx, dx)) or 1.0
     slope = num / den
     intercept = mean_y - slope * mean_x
     next_x = n
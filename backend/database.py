@@ -1,19 +1,100 @@
 # backend/database.py
 import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
 DB_PATH = Path(__file__).resolve().parent / "anlo.db"
 
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# One long-lived connection per thread (event loop + asyncio.to_thread workers)
+_local = threading.local()
+
+# Per-thread LRU of cursors keyed by SQL text, so hot statements skip the
+# parse/plan step on every auto-cycle tick
+STMT_CACHE_SIZE = 64
+
 
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Return this thread's persistent connection (autocommit mode).
+    Do not close it; it is reused by every helper on the thread.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STMT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+        _local.stmts = OrderedDict()
     return conn
 
 
-def dict_row(cursor: sqlite3.Cursor, row: sqlite3.Row) -> Dict[str, Any]:
-    return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+def _cached_cursor(sql: str) -> sqlite3.Cursor:
+    conn = get_connection()
+    stmts: "OrderedDict[str, sqlite3.Cursor]" = _local.stmts
+    cur = stmts.get(sql)
+    if cur is None:
+        cur = conn.cursor()
+        cur.row_factory = None
+        stmts[sql] = cur
+        if len(stmts) > STMT_CACHE_SIZE:
+            stmts.popitem(last=False)[1].close()
+    else:
+        stmts.move_to_end(sql)
+    return cur
+
+
+def execute_cached(sql: str, params: tuple = ()) -> sqlite3.Cursor:
+    """
+    Execute `sql` on this thread's connection through a cached cursor.
+    Rows come back as plain tuples (use fetch_all/fetch_one for dicts);
+    the cursor is reused for the same SQL text.
+    """
+    cur = _cached_cursor(sql)
+    cur.execute(sql, params)
+    return cur
+
+
+def executemany_cached(sql: str, seq_of_params: Iterable[tuple]) -> sqlite3.Cursor:
+    """executemany() counterpart of execute_cached: one call binds every row."""
+    cur = _cached_cursor(sql)
+    cur.executemany(sql, seq_of_params)
+    return cur
+
+
+@contextmanager
+def txn() -> Iterator[sqlite3.Connection]:
+    """
+    Group every statement in the block into one write transaction (one
+    commit). Nested use joins the outer transaction.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
 
 
 def init_db() -> None:
@@ -28,10 +109,16 @@ def init_db() -> None:
             type TEXT NOT NULL,
             category TEXT NOT NULL,
             amount REAL NOT NULL,
-            description TEXT
+            description TEXT,
+            balance_after REAL
         )
         """
     )
+    _migrate_balance_after(cur)
+    # Ordered read for get_transactions (ORDER BY date, id) without a sort
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tx_date_id ON transactions(date, id)"
+    )
 
     cur.execute(
         """
@@ -74,8 +161,36 @@ def init_db() -> None:
             (10000.0, "{}"),
         )
 
-    conn.commit()
-    conn.close()
+    # Refresh planner statistics so the indexes above are used
+    cur.execute("ANALYZE")
+
+
+def _migrate_balance_after(cur: sqlite3.Cursor) -> None:
+    """
+    Older databases embedded the balance in the description
+    ("... | balance_after=123.45"); move it into the balance_after column.
+    """
+    cols = {row[1] for row in cur.execute("PRAGMA table_info(transactions)")}
+    if "balance_after" in cols:
+        return
+
+    marker = " | balance_after="
+    cur.execute("ALTER TABLE transactions ADD COLUMN balance_after REAL")
+    rows = cur.execute(
+        "SELECT id, description FROM transactions WHERE description LIKE ?",
+        (f"%{marker.strip()}%",),
+    ).fetchall()
+    updates = []
+    for tx_id, desc in rows:
+        head, _, tail = desc.rpartition(marker)
+        try:
+            updates.append((float(tail.split()[0]), head, tx_id))
+        except (ValueError, IndexError):
+            continue
+    cur.executemany(
+        "UPDATE transactions SET balance_after = ?, description = ? WHERE id = ?",
+        updates,
+    )
 
 
 def reset_db() -> None:
@@ -85,34 +200,25 @@ def reset_db() -> None:
     cur.execute("DROP TABLE IF EXISTS balances")
     cur.execute("DROP TABLE IF EXISTS agent_logs")
     cur.execute("DROP TABLE IF EXISTS portfolio")
-    conn.commit()
-    conn.close()
     init_db()
 
 
+def _columns(cur: sqlite3.Cursor) -> List[str]:
+    return [d[0] for d in cur.description]
+
+
 def fetch_all(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    conn.row_factory = dict_row
-    cur = conn.cursor()
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    # column names are read once per query, not once per row
+    cur = execute_cached(query, params)
+    cols = _columns(cur)
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
 def fetch_one(query: str, params: tuple = ()) -> Dict[str, Any] | None:
-    conn = get_connection()
-    conn.row_factory = dict_row
-    cur = conn.cursor()
-    cur.execute(query, params)
+    cur = execute_cached(query, params)
     row = cur.fetchone()
-    conn.close()
-    return row
+    return dict(zip(_columns(cur), row)) if row is not None else None
 
 
 def execute(query: str, params: tuple = ()) -> None:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(query, params)
-    conn.commit()
-    conn.close()
+    execute_cached(query, params)
@@ -1,5 +1,5 @@
 # backend/main.py
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import os
 import sys
 from dotenv import load_dotenv
@@ -10,7 +10,8 @@ load_dotenv()
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import asyncio  # stdlib
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -29,6 +30,23 @@ from agents.llm_trader import LLMTrader
 # ============================================================
 AUTO_CYCLE_INTERVAL = 10  # seconds (edit for hackathon demo)
 
+def _run_and_store_cycle() -> Dict[str, Any]:
+    """
+    One cycle plus its agent_logs write. Sync on purpose: callers run it
+    via asyncio.to_thread so neither the cycle nor the SQLite write lock
+    (BEGIN IMMEDIATE, up to the busy timeout) ever blocks the event loop.
+    """
+    output = run_cycle()
+    output["cycle"] = utils.store_run_cycle_output(
+        output.get("state") or {},
+        output.get("plan") or {},
+        output.get("result") or {},
+        float(output.get("reward") or 0.0),
+        output.get("timestamp") or "",
+        output.get("date"),
+    )
+    return output
+
 async def auto_cycle_runner():
     """
     Runs the AI cycle automatically every N seconds.
@@ -40,17 +58,8 @@ async def auto_cycle_runner():
 
     while True:
         try:
-            # run_cycle may be synchronous — run it off the event loop to avoid blocking.
-            output = await asyncio.to_thread(run_cycle)
-
-            # store output (utils.store_run_cycle_output may be sync)
-            utils.store_run_cycle_output(
-                output.get("state") or {},
-                output.get("plan") or {},
-                output.get("result") or {},
-                float(output.get("reward") or 0.0),
-                output.get("timestamp") or "",
-            )
+            # cycle + DB write are synchronous — run both off the event loop
+            await asyncio.to_thread(_run_and_store_cycle)
 
             print("✔ Auto cycle executed.")
         except Exception as e:
@@ -92,6 +101,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _safe_float(value: Any) -> float:
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
 # Pydantic models for request validation
 class CommandRequest(BaseModel):
     command: str
@@ -137,22 +152,29 @@ def get_market_endpoint() -> Dict[str, Any]:
     return utils.get_market()
 
 @app.get("/logs")
-def get_logs_endpoint() -> List[Dict[str, Any]]:
-    return utils.get_logs()
+def get_logs_endpoint() -> Response:
+    # stored log JSON is passed through verbatim
+    return Response(content=utils.get_logs_json(), media_type="application/json")
+
+@app.get("/dashboard")
+def get_dashboard_endpoint(include: Optional[str] = None, logs: Optional[int] = None) -> Response:
+    # state + portfolio + market + transactions + logs in one round trip;
+    # ?include=state,market picks sections, ?logs=N keeps the last N cycles
+    sections = None
+    if include is not None:
+        sections = [s.strip() for s in include.split(",") if s.strip()]
+        unknown = set(sections) - set(utils.DASHBOARD_SECTIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown dashboard sections: {sorted(unknown)}")
+    return Response(
+        content=utils.get_dashboard_json(sections, logs_limit=logs),
+        media_type="application/json",
+    )
 
 @app.post("/run_cycle")
-def run_cycle_endpoint() -> Dict[str, Any]:
-    # run_cycle is potentially CPU-bound / sync — run in thread to avoid blocking uvicorn workers
-    output = asyncio.get_event_loop().run_until_complete(asyncio.to_thread(run_cycle))
-    cycle_id = utils.store_run_cycle_output(
-        output.get("state") or {},
-        output.get("plan") or {},
-        output.get("result") or {},
-        float(output.get("reward") or 0.0),
-        output.get("timestamp") or "",
-    )
-    output["cycle"] = cycle_id
-    return output
+async def run_cycle_endpoint() -> Dict[str, Any]:
+    # run_cycle and its log write are sync — run both in a thread to avoid blocking the event loop
+    return await asyncio.to_thread(_run_and_store_cycle)
 
 @app.post("/reset")
 def reset_endpoint() -> Dict[str, str]:
@@ -238,15 +260,18 @@ async def get_position(symbol: str) -> Dict[str, Any]:
 @app.get("/alpaca/status")
 async def get_alpaca_status() -> Dict[str, Any]:
     try:
-        account = await asyncio.to_thread(alpaca_mcp.get_account)
-        positions = await asyncio.to_thread(alpaca_mcp.get_all_positions)
-
-        total_unrealized_pl = 0.0
-        for p in positions:
-            try:
-                total_unrealized_pl += float(p.get("unrealized_pl", 0))
-            except Exception:
-                pass
+        # independent round-trips to Alpaca — run them concurrently
+        account, positions = await asyncio.gather(
+            asyncio.to_thread(alpaca_mcp.get_account),
+            asyncio.to_thread(alpaca_mcp.get_all_positions),
+        )
+
+        pl = np.fromiter(
+            (_safe_float(p.get("unrealized_pl")) for p in positions),
+            dtype=np.float64,
+            count=len(positions),
+        )
+        total_unrealized_pl = float(pl.sum())
 
         return {
             "account": account if account.get("success") else {},
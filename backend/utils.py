@@ -1,106 +1,263 @@
 # backend/utils.py
 import json
 import random
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from . import database as db
-from agents_investment.investment_agent import (
-    get_portfolio_value,
-    get_positions,
-    buy as portfolio_buy,
-    evaluate_investment_opportunity,
+
+# agents_investment (market simulator + portfolio) is imported on first use
+# inside the functions below, keeping it off the import path of callers
+# that only need the DB helpers
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=_ORJSON_OPTS).decode()
+
+else:
+    _dumps = json.dumps
+
+
+# Hot statements, executed through db.execute_cached
+UPSERT_BALANCE_SQL = "INSERT OR REPLACE INTO balances (date, balance) VALUES (?, ?)"
+INSERT_TRANSACTION_SQL = (
+    "INSERT INTO transactions (date, type, category, amount, description, balance_after) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_AGENT_LOG_SQL = (
+    "INSERT INTO agent_logs (timestamp, state, plan, result, reward) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_TRANSACTIONS_SQL = (
+    "SELECT id, date, type, category, amount, description, balance_after "
+    "FROM transactions ORDER BY date ASC, id ASC"
 )
-from agents_investment.market_generator import get_index_metrics
+SELECT_LOGS_SQL = (
+    "SELECT cycle, timestamp, state, plan, result, reward "
+    "FROM agent_logs ORDER BY cycle ASC"
+)
+SELECT_RECENT_LOGS_SQL = (
+    "SELECT cycle, timestamp, state, plan, result, reward "
+    "FROM agent_logs ORDER BY cycle DESC LIMIT ?"
+)
+
+# /dashboard sections, in response order
+DASHBOARD_SECTIONS = ("state", "portfolio", "market", "transactions", "logs")
+
+
+# Points kept per SIM_STATE history (older points are dropped)
+HISTORY_MAXLEN = 4096
+
+
+class HistoryBuffer:
+    """
+    Bounded float64 history backed by one contiguous array. Holds the last
+    `maxlen` values; the backing array grows by doubling up to 2 * maxlen,
+    after which the live window is slid back to the front (amortized O(1)
+    append). Supports len(), indexing (incl. [-1]), iteration and a
+    single-pass tolist().
+    """
+
+    __slots__ = ("_buf", "_start", "_end", "maxlen")
+
+    def __init__(
+        self, values=(), maxlen: int = HISTORY_MAXLEN, capacity: int = 256
+    ) -> None:
+        values = np.asarray(values, dtype=np.float64)[-maxlen:]
+        self.maxlen = maxlen
+        cap = min(max(capacity, 2 * len(values)), 2 * maxlen)
+        self._buf = np.empty(cap, dtype=np.float64)
+        self._buf[: len(values)] = values
+        self._start = 0
+        self._end = len(values)
+
+    def append(self, value: float) -> None:
+        if self._end == len(self._buf):
+            n = self._end - self._start
+            if len(self._buf) < 2 * self.maxlen:
+                buf = np.empty(min(2 * len(self._buf), 2 * self.maxlen), dtype=np.float64)
+            else:
+                buf = self._buf
+            buf[:n] = self._buf[self._start : self._end]
+            self._buf, self._start, self._end = buf, 0, n
+        self._buf[self._end] = value
+        self._end += 1
+        if self._end - self._start > self.maxlen:
+            self._start += 1
+
+    def view(self) -> np.ndarray:
+        return self._buf[self._start : self._end]
+
+    def tolist(self) -> List[float]:
+        return self.view().tolist()
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, idx):
+        return self.view()[idx]
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.tolist())
 
 
 SIM_STATE: Dict[str, Any] = {
     "bank_balance": 10000.0,
     "base_income": 5000.0,
     "base_expense": 3000.0,
-    "income_history": [],
-    "expense_history": [],
-    "balance_history": [10000.0],
-    "sip_history": [],
-    "lumpsum_history": [],
-    "nav_history": [],
+    "income_history": HistoryBuffer(),
+    "expense_history": HistoryBuffer(),
+    # all-time sums of income / expense (the histories are windowed)
+    "income_total": 0.0,
+    "expense_total": 0.0,
+    "balance_history": HistoryBuffer([10000.0]),
+    "sip_history": HistoryBuffer(),
+    "lumpsum_history": HistoryBuffer(),
+    "nav_history": HistoryBuffer(),
     "invested_amount": 0.0,
     "last_sip_suggested": 0.0,
+    # planner suggestion of the latest / previous cycle (for sip_delta_pct);
+    # None until that many cycles have run
+    "cycle_sip_suggested": None,
+    "prev_sip_suggested": None,
 }
 
 
 def reset_sim_state() -> None:
     SIM_STATE["bank_balance"] = 10000.0
-    SIM_STATE["income_history"] = []
-    SIM_STATE["expense_history"] = []
-    SIM_STATE["balance_history"] = [SIM_STATE["bank_balance"]]
-    SIM_STATE["sip_history"] = []
-    SIM_STATE["lumpsum_history"] = []
-    SIM_STATE["nav_history"] = []
+    SIM_STATE["income_history"] = HistoryBuffer()
+    SIM_STATE["expense_history"] = HistoryBuffer()
+    SIM_STATE["income_total"] = 0.0
+    SIM_STATE["expense_total"] = 0.0
+    SIM_STATE["balance_history"] = HistoryBuffer([SIM_STATE["bank_balance"]])
+    SIM_STATE["sip_history"] = HistoryBuffer()
+    SIM_STATE["lumpsum_history"] = HistoryBuffer()
+    SIM_STATE["nav_history"] = HistoryBuffer()
     SIM_STATE["invested_amount"] = 0.0
     SIM_STATE["last_sip_suggested"] = 0.0
+    SIM_STATE["cycle_sip_suggested"] = None
+    SIM_STATE["prev_sip_suggested"] = None
+    _invalidate_core_state()
 
 
-def _persist_balance(timestamp: str) -> None:
-    date = (timestamp.split("T")[0] if "T" in timestamp else timestamp) or "1970-01-01"
-    db.execute(
-        "INSERT OR REPLACE INTO balances (date, balance) VALUES (?, ?)",
-        (date, float(SIM_STATE["bank_balance"])),
-    )
+def _date_of(timestamp: str) -> str:
+    """ISO date part of a timestamp (run_cycle computes it once per cycle)."""
+    return timestamp.partition("T")[0] or "1970-01-01"
+
+
+def _persist_balance(date: str) -> None:
+    db.execute_cached(UPSERT_BALANCE_SQL, (date, float(SIM_STATE["bank_balance"])))
+
+
+def _transaction_row(
+    timestamp: str, ttype: str, amount: float, description: str, category: str = ""
+) -> tuple:
+    """Parameters for INSERT_TRANSACTION_SQL, stamped with the current balance."""
+    bal = float(SIM_STATE["bank_balance"])
+    return (timestamp, ttype, category, float(amount), description, bal)
 
 
 def _log_transaction(
     timestamp: str, ttype: str, amount: float, description: str, category: str = ""
 ) -> None:
     """
-    Store transaction in SQLite, embedding balance_after into description.
+    Store transaction in SQLite along with the bank balance after it.
     """
-    bal = SIM_STATE["bank_balance"]
-    desc = f"{description} | balance_after={bal:.2f}"
-    db.execute(
-        """
-        INSERT INTO transactions (date, type, category, amount, description)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (timestamp, ttype, category, float(amount), desc),
+    db.execute_cached(
+        INSERT_TRANSACTION_SQL,
+        _transaction_row(timestamp, ttype, amount, description, category),
     )
 
 
 def get_transactions() -> List[Dict[str, Any]]:
-    rows = db.fetch_all(
-        "SELECT id, date, type, category, amount, description "
-        "FROM transactions ORDER BY date ASC, id ASC"
-    )
-    out: List[Dict[str, Any]] = []
-    for r in rows:
-        bal_after = None
-        desc = r.get("description") or ""
-        marker = "balance_after="
-        if marker in desc:
-            try:
-                bal_after = float(desc.split(marker)[-1].split()[0])
-            except Exception:
-                bal_after = None
-        out.append(
-            {
-                "id": r["id"],
-                "timestamp": r["date"],
-                "type": r["type"],
-                "category": r["category"],
-                "amount": float(r["amount"]),
-                "description": desc,
-                "balance_after": bal_after,
-            }
-        )
-    return out
+    rows = db.execute_cached(SELECT_TRANSACTIONS_SQL).fetchall()
+    return [
+        {
+            "id": tx_id,
+            "timestamp": date,
+            "type": ttype,
+            "category": category,
+            "amount": float(amount),
+            "description": description or "",
+            "balance_after": balance_after,
+        }
+        for tx_id, date, ttype, category, amount, description, balance_after in rows
+    ]
+
+
+# get_index_metrics() result shared by /state, /market and the cycle;
+# reused within the TTL while the market step is unchanged
+_METRICS_TTL = 1.0
+_LAST_METRICS: Dict[str, Any] = {"t": 0.0, "step": -1, "v": None}
+
+
+def _cached_index_metrics() -> tuple:
+    from agents_investment.market_generator import get_index_metrics, get_step
+
+    now = time.monotonic()
+    step = get_step()
+    if (
+        _LAST_METRICS["v"] is not None
+        and _LAST_METRICS["step"] == step
+        and now - _LAST_METRICS["t"] < _METRICS_TTL
+    ):
+        return _LAST_METRICS["v"]
+
+    metrics = get_index_metrics()
+    _LAST_METRICS.update(t=now, step=step, v=metrics)
+    return metrics
+
+
+# Short-lived core state cache: writes bump the generation, reads within the
+# TTL (on the same market step and generation) reuse it. A fill is only
+# stored if no write landed while it was being built.
+_CORE_TTL = 1.0
+_STATE_CACHE: Dict[str, Any] = {"t": 0.0, "step": -1, "gen": 0, "core": None, "core_gen": -1}
+
+
+def _invalidate_core_state() -> None:
+    _STATE_CACHE["gen"] += 1
 
 
 def _construct_core_state() -> Dict[str, Any]:
-    price_history, current_price, vol, ret = get_index_metrics()
+    from agents_investment.market_generator import get_step
+
+    now = time.monotonic()
+    step = get_step()
+    gen = _STATE_CACHE["gen"]
+    if (
+        _STATE_CACHE["core"] is not None
+        and _STATE_CACHE["core_gen"] == gen
+        and _STATE_CACHE["step"] == step
+        and now - _STATE_CACHE["t"] < _CORE_TTL
+    ):
+        return dict(_STATE_CACHE["core"])
+
+    core = _build_core_state()
+    if _STATE_CACHE["gen"] == gen:
+        _STATE_CACHE.update(t=now, step=step, core=core, core_gen=gen)
+    return dict(core)
+
+
+def _build_core_state() -> Dict[str, Any]:
+    from agents_investment.investment_agent import get_portfolio_value
+
+    price_history, current_price, vol, ret = _cached_index_metrics()
     nav_holdings = get_portfolio_value()
     bank_balance = float(SIM_STATE["bank_balance"])
 
-    income_hist: List[float] = SIM_STATE["income_history"]
-    expense_hist: List[float] = SIM_STATE["expense_history"]
+    income_hist: HistoryBuffer = SIM_STATE["income_history"]
+    expense_hist: HistoryBuffer = SIM_STATE["expense_history"]
     monthly_income = float(income_hist[-1]) if income_hist else 0.0
     monthly_expense = float(expense_hist[-1]) if expense_hist else 0.0
     emergency_buffer = monthly_expense * 3.0 if monthly_expense > 0 else 0.0
@@ -128,19 +285,27 @@ def _construct_core_state() -> Dict[str, Any]:
         "monthly_expense": monthly_expense,
         "emergency_buffer": emergency_buffer,
         "price_history": price_history,
-        "nav_history": SIM_STATE["nav_history"],
+        "nav_history": SIM_STATE["nav_history"].tolist(),
     }
     return core
 
 
 def _recompute_sip_suggestion(state_for_agent: Dict[str, Any]) -> float:
+    from agents_investment.investment_agent import evaluate_investment_opportunity
+
     rec = evaluate_investment_opportunity(state_for_agent) or {}
     sip = float(rec.get("sip_suggested_amount", rec.get("amount", 0.0) or 0.0))
     SIM_STATE["last_sip_suggested"] = sip
     return sip
 
 
-def simulate_income_and_expense(timestamp: str) -> Dict[str, float]:
+def record_sip_suggestion(sip: float) -> None:
+    """Called once per cycle with the planner's SIP suggestion."""
+    SIM_STATE["prev_sip_suggested"] = SIM_STATE["cycle_sip_suggested"]
+    SIM_STATE["cycle_sip_suggested"] = float(sip)
+
+
+def simulate_income_and_expense(timestamp: str, date: Optional[str] = None) -> Dict[str, float]:
     base_inc = float(SIM_STATE["base_income"])
     base_exp = float(SIM_STATE["base_expense"])
 
@@ -149,57 +314,64 @@ def simulate_income_and_expense(timestamp: str) -> Dict[str, float]:
 
     SIM_STATE["bank_balance"] += income
     SIM_STATE["income_history"].append(income)
-    _log_transaction(timestamp, "income", income, "unstable income", "income")
+    SIM_STATE["income_total"] += income
+    income_row = _transaction_row(timestamp, "income", income, "unstable income", "income")
 
     SIM_STATE["bank_balance"] -= expense
     SIM_STATE["expense_history"].append(expense)
-    _log_transaction(timestamp, "expense", expense, "variable expense", "expense")
+    SIM_STATE["expense_total"] += expense
+    expense_row = _transaction_row(timestamp, "expense", expense, "variable expense", "expense")
 
     SIM_STATE["balance_history"].append(SIM_STATE["bank_balance"])
-    _persist_balance(timestamp)
 
-    core = _construct_core_state()
-    _recompute_sip_suggestion(core)
+    with db.txn():
+        db.executemany_cached(INSERT_TRANSACTION_SQL, (income_row, expense_row))
+        _persist_balance(date or _date_of(timestamp))
+
+    _invalidate_core_state()
 
     return {"monthly_income": income, "monthly_expense": expense}
 
 
 def apply_investment(
-    timestamp: str, mode: str, ticker: str, amount: float
+    timestamp: str, mode: str, ticker: str, amount: float, date: Optional[str] = None
 ) -> Dict[str, Any]:
+    from agents_investment.investment_agent import buy as portfolio_buy
+
     amount = max(0.0, float(amount))
     if amount <= 0.0:
         SIM_STATE["sip_history"].append(0.0)
         SIM_STATE["lumpsum_history"].append(0.0)
+        _invalidate_core_state()
         return {"status": "noop", "amount": 0.0}
 
     invest_amt = min(amount, SIM_STATE["bank_balance"])
     SIM_STATE["bank_balance"] -= invest_amt
 
-    if mode == "lumpsum":
-        SIM_STATE["sip_history"].append(0.0)
-        SIM_STATE["lumpsum_history"].append(invest_amt)
-        _log_transaction(timestamp, "lumpsum", invest_amt, "lump-sum investment", "invest")
-    else:
-        SIM_STATE["sip_history"].append(invest_amt)
-        SIM_STATE["lumpsum_history"].append(0.0)
-        _log_transaction(timestamp, "sip", invest_amt, "SIP investment", "invest")
-
-    trade_result = portfolio_buy(ticker, invest_amt)
-    _log_transaction(
-        timestamp,
-        "portfolio_buy",
-        invest_amt,
-        f"Portfolio buy {ticker}",
-        "portfolio",
-    )
+    with db.txn():
+        if mode == "lumpsum":
+            SIM_STATE["sip_history"].append(0.0)
+            SIM_STATE["lumpsum_history"].append(invest_amt)
+            _log_transaction(timestamp, "lumpsum", invest_amt, "lump-sum investment", "invest")
+        else:
+            SIM_STATE["sip_history"].append(invest_amt)
+            SIM_STATE["lumpsum_history"].append(0.0)
+            _log_transaction(timestamp, "sip", invest_amt, "SIP investment", "invest")
+
+        trade_result = portfolio_buy(ticker, invest_amt)
+        _log_transaction(
+            timestamp,
+            "portfolio_buy",
+            invest_amt,
+            f"Portfolio buy {ticker}",
+            "portfolio",
+        )
 
-    SIM_STATE["balance_history"].append(SIM_STATE["bank_balance"])
-    SIM_STATE["invested_amount"] += invest_amt
-    _persist_balance(timestamp)
+        SIM_STATE["balance_history"].append(SIM_STATE["bank_balance"])
+        SIM_STATE["invested_amount"] += invest_amt
+        _persist_balance(date or _date_of(timestamp))
 
-    core = _construct_core_state()
-    _recompute_sip_suggestion(core)
+    _invalidate_core_state()
 
     return trade_result
 
@@ -218,34 +390,50 @@ def insert_transaction(tx: Dict[str, Any]) -> None:
     if ttype == "income":
         SIM_STATE["bank_balance"] += amount
         SIM_STATE["income_history"].append(amount)
+        SIM_STATE["income_total"] += amount
     elif ttype in ("expense", "repay"):
         SIM_STATE["bank_balance"] -= amount
         SIM_STATE["expense_history"].append(amount)
+        SIM_STATE["expense_total"] += amount
 
-    SIM_STATE["balance_history"].append(SIM_STATE["bank_balance"])
-    _persist_balance(timestamp)
-    _log_transaction(timestamp, ttype, amount, desc, category)
+    with db.txn():
+        SIM_STATE["balance_history"].append(SIM_STATE["bank_balance"])
+        _persist_balance(_date_of(timestamp))
+        _log_transaction(timestamp, ttype, amount, desc, category)
 
-    core = _construct_core_state()
-    _recompute_sip_suggestion(core)
+    _invalidate_core_state()
 
 
 def update_nav_history() -> float:
+    from agents_investment.investment_agent import get_portfolio_value
+
     nav = get_portfolio_value()
     SIM_STATE["nav_history"].append(nav)
+    _invalidate_core_state()
     return nav
 
 
+def get_core_state() -> Dict[str, Any]:
+    """Core financial state only (no SIP re-evaluation or cashflow totals)."""
+    return _construct_core_state()
+
+
 def get_state() -> Dict[str, Any]:
     core = _construct_core_state()
     _recompute_sip_suggestion(core)
-    core["sip_suggested_amount"] = SIM_STATE["last_sip_suggested"]
-    core["cashflow_inflow"] = float(sum(SIM_STATE["income_history"]))
-    core["cashflow_outflow"] = float(sum(SIM_STATE["expense_history"]))
+    sip = SIM_STATE["last_sip_suggested"]
+    core["sip_suggested_amount"] = sip
+    # change against the previous cycle's suggestion; 0 until there is one
+    prev = SIM_STATE["prev_sip_suggested"]
+    core["sip_delta_pct"] = (sip - prev) / abs(sip) * 100.0 if sip and prev is not None else 0.0
+    core["cashflow_inflow"] = float(SIM_STATE["income_total"])
+    core["cashflow_outflow"] = float(SIM_STATE["expense_total"])
     return core
 
 
 def get_portfolio() -> Dict[str, Any]:
+    from agents_investment.investment_agent import get_portfolio_value, get_positions
+
     positions = get_positions()
     nav_holdings = get_portfolio_value()
     cash = float(SIM_STATE["bank_balance"])
@@ -257,9 +445,11 @@ def get_portfolio() -> Dict[str, Any]:
 
     nav_hist = SIM_STATE["nav_history"]
     if len(nav_hist) >= 2:
-        daily_pl = nav_hist[-1] - nav_hist[-2]
+        daily_pl = float(nav_hist[-1] - nav_hist[-2])
     else:
         daily_pl = 0.0
+    today_base = total_value - daily_pl if total_value > daily_pl else total_value
+    today_pct = (daily_pl / today_base * 100.0) if today_base > 0 else 0.0
 
     return {
         "cash": cash,
@@ -269,45 +459,68 @@ def get_portfolio() -> Dict[str, Any]:
         "absolute_profit_loss": abs_pl,
         "percentage_profit_loss": pct_pl,
         "daily_profit_loss": daily_pl,
+        "today_pl_pct": today_pct,
         "sip_suggested_amount": SIM_STATE["last_sip_suggested"],
-        "cashflow_inflow": float(sum(SIM_STATE["income_history"])),
-        "cashflow_outflow": float(sum(SIM_STATE["expense_history"])),
+        "cashflow_inflow": float(SIM_STATE["income_total"]),
+        "cashflow_outflow": float(SIM_STATE["expense_total"]),
     }
 
 
-def get_logs() -> List[Dict[str, Any]]:
-    rows = db.fetch_all(
-        "SELECT cycle, timestamp, state, plan, result, reward "
-        "FROM agent_logs ORDER BY cycle ASC"
+def get_logs_json(limit: Optional[int] = None) -> bytes:
+    """
+    /logs response body, assembled from the stored state/plan/result JSON
+    text as-is (no decode + re-encode per row): a JSON list of
+    {cycle, timestamp, state, plan, result, reward} objects.
+    With `limit`, only the last `limit` cycles (still oldest first).
+    """
+    if limit is None:
+        rows = db.execute_cached(SELECT_LOGS_SQL).fetchall()
+    else:
+        rows = db.execute_cached(SELECT_RECENT_LOGS_SQL, (max(int(limit), 0),)).fetchall()
+        rows.reverse()
+    body = ",".join(
+        f'{{"cycle":{int(cycle)},"timestamp":{_dumps(ts)},"state":{state},'
+        f'"plan":{plan},"result":{result},"reward":{_dumps(float(reward))}}}'
+        for cycle, ts, state, plan, result, reward in rows
     )
-    out: List[Dict[str, Any]] = []
-    for r in rows:
-        out.append(
-            {
-                "cycle": int(r["cycle"]),
-                "timestamp": r["timestamp"],
-                "state": json.loads(r["state"]),
-                "plan": json.loads(r["plan"]),
-                "result": json.loads(r["result"]),
-                "reward": float(r["reward"]),
-            }
-        )
-    return out
+    return ("[" + body + "]").encode()
+
+
+def get_dashboard_json(
+    include: Optional[Iterable[str]] = None, logs_limit: Optional[int] = None
+) -> bytes:
+    """
+    /dashboard response body: the requested DASHBOARD_SECTIONS (all by
+    default) in one payload, with logs spliced in from get_logs_json().
+    `logs_limit` caps logs to the last N cycles.
+    """
+    wanted = set(DASHBOARD_SECTIONS if include is None else include)
+    builders = {
+        "state": get_state,
+        "portfolio": get_portfolio,
+        "market": get_market,
+        "transactions": get_transactions,
+    }
+    head = _dumps({k: builders[k]() for k in DASHBOARD_SECTIONS if k in builders and k in wanted})
+    if "logs" not in wanted:
+        return head.encode()
+    sep = b"," if len(head) > 2 else b""
+    return head[:-1].encode() + sep + b'"logs":' + get_logs_json(logs_limit) + b"}"
 
 
 def get_market() -> Dict[str, Any]:
-    price_history, current_price, vol, ret = get_index_metrics()
+    price_history, current_price, vol, ret = _cached_index_metrics()
     return {
-        "price_history": [float(x) for x in price_history],
+        "price_history": price_history,
         "current_price": float(current_price),
         "volatility": float(vol),
         "return_rate": float(ret),
-        "nav_history": [float(x) for x in SIM_STATE["nav_history"]],
-        "sip_history": [float(x) for x in SIM_STATE["sip_history"]],
-        "lumpsum_history": [float(x) for x in SIM_STATE["lumpsum_history"]],
-        "income_history": [float(x) for x in SIM_STATE["income_history"]],
-        "expense_history": [float(x) for x in SIM_STATE["expense_history"]],
-        "balance_history": [float(x) for x in SIM_STATE["balance_history"]],
+        "nav_history": SIM_STATE["nav_history"].tolist(),
+        "sip_history": SIM_STATE["sip_history"].tolist(),
+        "lumpsum_history": SIM_STATE["lumpsum_history"].tolist(),
+        "income_history": SIM_STATE["income_history"].tolist(),
+        "expense_history": SIM_STATE["expense_history"].tolist(),
+        "balance_history": SIM_STATE["balance_history"].tolist(),
     }
 
 
@@ -317,30 +530,24 @@ def store_run_cycle_output(
     result: Dict[str, Any],
     reward: float,
     timestamp: str,
+    date: Optional[str] = None,
 ) -> int:
-    conn = db.get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO agent_logs (timestamp, state, plan, result, reward)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (
-            timestamp,
-            json.dumps(state),
-            json.dumps(plan),
-            json.dumps(result),
-            float(reward),
-        ),
-    )
-    cycle_id = cur.lastrowid
-
-    bal = state.get("bank_balance", state.get("balance", 0.0))
-    cur.execute(
-        "INSERT OR REPLACE INTO balances (date, balance) VALUES (?, ?)",
-        (timestamp.split("T")[0], float(bal)),
-    )
+    # nav_history grows every cycle and already lives in /market; keeping it
+    # out of each log row keeps agent_logs (and /logs) linear in cycles
+    logged_state = {k: v for k, v in state.items() if k != "nav_history"}
+    with db.txn():
+        cur = db.execute_cached(
+            INSERT_AGENT_LOG_SQL,
+            (
+                timestamp,
+                _dumps(logged_state),
+                _dumps(plan),
+                _dumps(result),
+                float(reward),
+            ),
+        )
+        cycle_id = cur.lastrowid
 
-    conn.commit()
-    conn.close()
+        bal = state.get("bank_balance", state.get("balance", 0.0))
+        db.execute_cached(UPSERT_BALANCE_SQL, (date or _date_of(timestamp), float(bal)))
     return cycle_id
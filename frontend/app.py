@@ -1,6 +1,7 @@
 # frontend/app.py
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 from pages import overview, cashflow, agent_logs, investments
 
 # Import live_trading with error handling
@@ -13,13 +14,23 @@ except ImportError as e:
 
 API_BASE = "http://localhost:8000"
 
+# One keep-alive session shared across Streamlit reruns
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+@st.cache_data(ttl=2, show_spinner=False)
+def cached_get(endpoint: str):
+    """GET shared across reruns for 2s; cleared by any POST through api()."""
+    r = _SESSION.get(API_BASE + endpoint, timeout=5)
+    r.raise_for_status()
+    return r.json()
+
 def api(endpoint: str, method: str = "GET", json=None):
-    url = API_BASE + endpoint
     if method.upper() == "GET":
-        r = requests.get(url, timeout=5)
-    else:
-        r = requests.post(url, json=json, timeout=5)
+        return cached_get(endpoint)
+    r = _SESSION.post(API_BASE + endpoint, json=json, timeout=5)
     r.raise_for_status()
+    cached_get.clear()
     return r.json()
 
 def main():
@@ -0,0 +1,91 @@
+# frontend/charts.py
+"""
+Hand-written Vega-Lite specs for st.vega_lite_chart (no Altair schema
+building / validation on every rerun), plus LTTB downsampling so long
+histories reach the browser as at most MAX_POINTS points per series.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Most points handed to a single chart series; longer histories are
+# downsampled with LTTB first
+MAX_POINTS = 500
+
+_TYPES = {"Q": "quantitative", "O": "ordinal", "N": "nominal", "T": "temporal"}
+
+
+def _field(shorthand: str) -> Dict[str, str]:
+    # "step:Q" -> {"field": "step", "type": "quantitative"}
+    name, _, kind = shorthand.partition(":")
+    return {"field": name, "type": _TYPES[kind or "Q"]}
+
+
+def line_spec(
+    x: str, y: str, color: Optional[str] = None, point: bool = False, height: int = 260
+) -> Dict[str, Any]:
+    mark: Dict[str, Any] = {"type": "line", "point": point}
+    if color:
+        mark["color"] = color
+    return {"mark": mark, "encoding": {"x": _field(x), "y": _field(y)}, "height": height}
+
+
+def bar_spec(
+    x: str,
+    y: str,
+    color: Optional[str] = None,
+    color_field: Optional[str] = None,
+    height: int = 260,
+) -> Dict[str, Any]:
+    mark: Dict[str, Any] = {"type": "bar"}
+    if color:
+        mark["color"] = color
+    encoding = {"x": _field(x), "y": _field(y)}
+    if color_field:
+        encoding["color"] = _field(color_field)
+    return {"mark": mark, "encoding": encoding, "height": height}
+
+
+def arc_spec(theta: str, color_field: str, outer_radius: int = 110) -> Dict[str, Any]:
+    return {
+        "mark": {"type": "arc", "outerRadius": outer_radius},
+        "encoding": {"theta": _field(theta), "color": _field(color_field)},
+    }
+
+
+def lttb_indices(ys, threshold: int = MAX_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of the
+    series `ys` (x = 0..n-1) that preserve its visual shape. Always keeps
+    the first and last point.
+    """
+    y = np.asarray(ys, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        # average of the next bucket is the third triangle vertex
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = (nxt_lo + nxt_hi - 1) / 2.0
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(ys, threshold: int = MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """(steps, values) of `ys` reduced to at most `threshold` points."""
+    y = np.asarray(ys, dtype=np.float64)
+    idx = lttb_indices(y, threshold)
+    return idx, y[idx]
@@ -1,21 +1,19 @@
 # frontend/pages/cashflow.py
-import time
-
 import streamlit as st
 import pandas as pd
-import altair as alt
+import numpy as np
+
+from charts import MAX_POINTS, bar_spec, downsample, line_spec, lttb_indices
+from tables import transactions_df
 
 
 def render(api):
     st.title("Cash Flow")
 
-    txs = api("/transactions")
-    df = pd.DataFrame(txs) if txs else pd.DataFrame(
-        columns=["id", "timestamp", "type", "category", "amount", "description", "balance_after"]
-    )
+    data = api("/dashboard?include=state,market,transactions")
+    txs, state, market = data["transactions"], data["state"], data["market"]
+    df = transactions_df(txs)
 
-    state = api("/state")
-    market = api("/market")
     bank_balance = state["bank_balance"]
     emergency = state["emergency_buffer"]
     suggested_sip = state.get("sip_suggested_amount", 0.0)
@@ -53,7 +51,6 @@ def render(api):
                         "description": desc,
                     },
                 )
-                time.sleep(0.5)
             st.success("Transaction added successfully!")
             st.session_state["saving_tx"] = False
             st.rerun()
@@ -63,31 +60,23 @@ def render(api):
     balance_hist = market["balance_history"]
 
     if income_hist and expense_hist:
-        steps = list(range(max(len(income_hist), len(expense_hist))))
-        df_flow = pd.DataFrame(
-            {
-                "step": steps,
-                "Inflow": income_hist + [0.0] * (len(steps) - len(income_hist)),
-                "Outflow": expense_hist + [0.0] * (len(steps) - len(expense_hist)),
-            }
-        )
+        n = max(len(income_hist), len(expense_hist))
+        inflow = np.pad(np.asarray(income_hist, dtype=np.float64), (0, n - len(income_hist)))
+        outflow = np.pad(np.asarray(expense_hist, dtype=np.float64), (0, n - len(expense_hist)))
+        df_flow = pd.DataFrame({"step": np.arange(n), "Inflow": inflow, "Outflow": outflow})
+        if len(df_flow) > MAX_POINTS:
+            keep = np.union1d(
+                lttb_indices(df_flow["Inflow"]), lttb_indices(df_flow["Outflow"])
+            )
+            df_flow = df_flow.iloc[keep]
         df_m = df_flow.melt(id_vars="step", var_name="type", value_name="amount")
         st.subheader("Monthly Inflow / Outflow")
-        chart = (
-            alt.Chart(df_m)
-            .mark_bar()
-            .encode(x="step:O", y="amount:Q", color="type:N")
-            .properties(height=260)
-        )
-        st.altair_chart(chart, use_container_width=True)
+        chart = bar_spec("step:O", "amount:Q", color_field="type:N")
+        st.vega_lite_chart(df_m, chart, use_container_width=True)
 
     if balance_hist:
         st.subheader("Running Cash Balance")
-        df_b = pd.DataFrame({"step": range(len(balance_hist)), "balance": balance_hist})
-        chart_b = (
-            alt.Chart(df_b)
-            .mark_line()
-            .encode(x="step:Q", y="balance:Q")
-            .properties(height=260)
-        )
-        st.altair_chart(chart_b, use_container_width=True)
+        steps_b, balance_b = downsample(balance_hist)
+        df_b = pd.DataFrame({"step": steps_b, "balance": balance_b})
+        chart_b = line_spec("step:Q", "balance:Q")
+        st.vega_lite_chart(df_b, chart_b, use_container_width=True)
@@ -1,59 +1,140 @@
 # frontend/pages/investments.py
 import streamlit as st
 import pandas as pd
-import altair as alt
-import math
+import numpy as np
+
+# Optional: JIT-compile the NAV analytics kernel when numba is installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from charts import bar_spec, downsample, line_spec
+from tables import transactions_df
 
 
 def _compute_holdings_table(port, market):
     positions = port.get("positions", {}) or {}
-    price = market["current_price"]
-    rows = []
-    total_value = 0.0
-    for t, units in positions.items():
-        curr_val = units * price
-        invested = curr_val  # if you later track cost basis, replace here
-        abs_pl = curr_val - invested
-        daily_pl = 0.0
-        rows.append(
-            {
-                "Ticker": t,
-                "Current Value": curr_val,
-                "Invested Amount": invested,
-                "Absolute P/L": abs_pl,
-                "Daily P/L": daily_pl,
-                "Quantity": units,
-                "Avg Buy Price": price,
-            }
-        )
-        total_value += curr_val
-
-    for r in rows:
-        r["Allocation %"] = (
-            r["Current Value"] / total_value * 100.0 if total_value > 0 else 0.0
-        )
-
-    return pd.DataFrame(rows)
+    return _holdings(tuple(sorted(positions.items())), market["current_price"])
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _holdings(positions, price):
+    """Holdings table for hashable (ticker, units) pairs at `price`."""
+    tickers = [t for t, _ in positions]
+    units = np.fromiter((u for _, u in positions), dtype=np.float64, count=len(positions))
+    curr_val = units * price
+    invested = curr_val  # if you later track cost basis, replace here
+    total_value = curr_val.sum()
+    alloc = curr_val / total_value * 100.0 if total_value > 0 else np.zeros_like(curr_val)
+
+    return pd.DataFrame(
+        {
+            "Ticker": tickers,
+            "Current Value": curr_val,
+            "Invested Amount": invested,
+            "Absolute P/L": curr_val - invested,
+            "Daily P/L": np.zeros_like(curr_val),
+            "Quantity": units,
+            "Avg Buy Price": np.full_like(curr_val, price),
+            "Allocation %": alloc,
+        }
+    )
+
+
+def _raw(values):
+    # float64 bytes: a cheap, exact cache key for a history list
+    return np.asarray(values, dtype=np.float64).tobytes()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _hist_df(x, name, raw, lttb=False):
+    """(x, name) frame for a history passed as _raw() bytes; optionally LTTB-reduced."""
+    values = np.frombuffer(raw, dtype=np.float64)
+    if lttb:
+        steps, values = downsample(values)
+    else:
+        steps = np.arange(len(values))
+    return pd.DataFrame({x: steps, name: values})
 
 
 def _simple_drawdown(nav_hist):
-    if not nav_hist:
+    nav = np.asarray(nav_hist, dtype=np.float64)
+    if nav.size == 0:
         return 0.0
-    peak = nav_hist[0]
-    max_dd = 0.0
-    for v in nav_hist:
-        peak = max(peak, v)
-        dd = (v - peak) / peak if peak > 0 else 0.0
-        max_dd = min(max_dd, dd)
-    return max_dd
+    peaks = np.maximum.accumulate(nav)
+    dd = np.divide(nav - peaks, peaks, out=np.zeros_like(nav), where=peaks > 0)
+    return min(0.0, float(dd.min()))
+
+
+def _nav_analytics_np(nav, win):
+    """
+    (returns, rolling vol over `win`, mean return, return std) of a NAV
+    series; steps after a non-positive NAV are skipped.
+    """
+    prev = nav[:-1]
+    valid = prev > 0
+    rets = (nav[1:][valid] - prev[valid]) / prev[valid]
+    roll = pd.Series(rets).rolling(win, min_periods=1).std(ddof=0).to_numpy()
+    if rets.size == 0:
+        return rets, roll, 0.0, 0.0
+    return rets, roll, float(rets.mean()), float(rets.std())
+
+
+def _nav_analytics_loop(nav, win):
+    """Single-pass version of _nav_analytics_np, written for numba."""
+    n = nav.shape[0]
+    rets = np.empty(max(n - 1, 0))
+    k = 0
+    for i in range(1, n):
+        p = nav[i - 1]
+        if p > 0:
+            rets[k] = (nav[i] - p) / p
+            k += 1
+    rets = rets[:k]
+
+    # windowed Welford mean/M2 (population std), plus all-time Welford;
+    # avoids the cancellation of sum(x^2)/n - mean^2
+    roll = np.empty(k)
+    mean = 0.0
+    m2 = 0.0
+    avg = 0.0
+    acc = 0.0
+    for i in range(k):
+        r = rets[i]
+        d = r - avg
+        avg += d / (i + 1)
+        acc += d * (r - avg)
+
+        if i < win:
+            d = r - mean
+            mean += d / (i + 1)
+            m2 += d * (r - mean)
+            m = i + 1
+        else:
+            # slide: replace the oldest return with r in one update
+            old = rets[i - win]
+            prev_mean = mean
+            mean += (r - old) / win
+            m2 += (r - old) * (r - mean + old - prev_mean)
+            m = win
+        roll[i] = np.sqrt(m2 / m) if m2 > 0.0 else 0.0
+    if k == 0:
+        return rets, roll, 0.0, 0.0
+    return rets, roll, avg, np.sqrt(acc / k) if acc > 0.0 else 0.0
+
+
+if njit is not None:
+    _nav_analytics = njit(cache=True, fastmath=True)(_nav_analytics_loop)
+else:
+    _nav_analytics = _nav_analytics_np
 
 
 def render(api):
     st.title("Investments")
 
-    port = api("/portfolio")
-    market = api("/market")
-    logs = api("/logs")
+    data = api("/dashboard?include=portfolio,market,transactions")
+    port, market = data["portfolio"], data["market"]
 
     tabs = st.tabs(["Holdings", "SIPs", "Lump-sum", "Transactions", "Watchlist"])
 
@@ -77,17 +158,12 @@ def render(api):
         sip_hist = market["sip_history"]
 
         if sip_hist:
-            df_sip = pd.DataFrame(
-                {"cycle": range(len(sip_hist)), "sip_amount": sip_hist}
-            )
+            sip_raw = _raw(sip_hist)
+            df_sip = _hist_df("cycle", "sip_amount", sip_raw)
             st.dataframe(df_sip, use_container_width=True, height=220)
-            chart_sip = (
-                alt.Chart(df_sip)
-                .mark_line(color="#00b386", point=True)
-                .encode(x="cycle:Q", y="sip_amount:Q")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_sip, use_container_width=True)
+            df_sip_chart = _hist_df("cycle", "sip_amount", sip_raw, lttb=True)
+            chart_sip = line_spec("cycle:Q", "sip_amount:Q", color="#00b386", point=True)
+            st.vega_lite_chart(df_sip_chart, chart_sip, use_container_width=True)
         else:
             st.info("No SIPs executed yet. The agent will create SIPs as conditions allow.")
 
@@ -97,24 +173,19 @@ def render(api):
         lump_hist = market["lumpsum_history"]
 
         if lump_hist:
-            df_lump = pd.DataFrame(
-                {"cycle": range(len(lump_hist)), "lumpsum_amount": lump_hist}
-            )
+            lump_raw = _raw(lump_hist)
+            df_lump = _hist_df("cycle", "lumpsum_amount", lump_raw)
             st.dataframe(df_lump, use_container_width=True, height=220)
-            chart_lump = (
-                alt.Chart(df_lump)
-                .mark_bar(color="#f97316")
-                .encode(x="cycle:Q", y="lumpsum_amount:Q")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_lump, use_container_width=True)
+            df_lump_chart = _hist_df("cycle", "lumpsum_amount", lump_raw, lttb=True)
+            chart_lump = bar_spec("cycle:Q", "lumpsum_amount:Q", color="#f97316")
+            st.vega_lite_chart(df_lump_chart, chart_lump, use_container_width=True)
         else:
             st.info("No lump-sum investments yet. They trigger only on strong BUY signals.")
 
     # --- Transactions ---
     with tabs[3]:
-        txs = api("/transactions")
-        df_tx = pd.DataFrame(txs) if txs else pd.DataFrame()
+        txs = data["transactions"]
+        df_tx = transactions_df(txs)
         st.subheader("Transactions")
         st.dataframe(df_tx, use_container_width=True, height=350)
 
@@ -124,14 +195,9 @@ def render(api):
         st.write("INDEX (simulated)")
         price_hist = market["price_history"]
         if price_hist:
-            df_price = pd.DataFrame({"step": range(len(price_hist)), "price": price_hist})
-            chart_p = (
-                alt.Chart(df_price)
-                .mark_line(color="#0ea5e9")
-                .encode(x="step:Q", y="price:Q")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_p, use_container_width=True)
+            df_price = _hist_df("step", "price", _raw(price_hist), lttb=True)
+            chart_p = line_spec("step:Q", "price:Q", color="#0ea5e9")
+            st.vega_lite_chart(df_price, chart_p, use_container_width=True)
         else:
             st.info("No price history yet. Run a cycle to start the market simulation.")
 
@@ -141,61 +207,32 @@ def render(api):
 
     nav_hist = market["nav_history"]
     if nav_hist:
-        df_nav = pd.DataFrame({"step": range(len(nav_hist)), "nav": nav_hist})
+        nav = np.asarray(nav_hist, dtype=np.float64)
+        df_nav = _hist_df("step", "nav", nav.tobytes(), lttb=True)
         c1, c2 = st.columns(2)
         with c1:
             st.write("Portfolio Growth (NAV)")
-            chart_nav = (
-                alt.Chart(df_nav)
-                .mark_line(color="#00b386")
-                .encode(x="step:Q", y="nav:Q")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_nav, use_container_width=True)
+            chart_nav = line_spec("step:Q", "nav:Q", color="#00b386")
+            st.vega_lite_chart(df_nav, chart_nav, use_container_width=True)
 
         with c2:
-            base = nav_hist[0]
-            df_pl = pd.DataFrame(
-                {"step": range(len(nav_hist)), "pl": [v - base for v in nav_hist]}
-            )
+            base = nav[0]
+            df_pl = _hist_df("step", "pl", (nav - base).tobytes(), lttb=True)
             st.write("Profit / Loss Timeline")
-            chart_pl = (
-                alt.Chart(df_pl)
-                .mark_line(color="#f97316")
-                .encode(x="step:Q", y="pl:Q")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_pl, use_container_width=True)
+            chart_pl = line_spec("step:Q", "pl:Q", color="#f97316")
+            st.vega_lite_chart(df_pl, chart_pl, use_container_width=True)
 
         # Rolling volatility
-        rets = []
-        for i in range(1, len(nav_hist)):
-            if nav_hist[i - 1] > 0:
-                rets.append((nav_hist[i] - nav_hist[i - 1]) / nav_hist[i - 1])
-        roll = []
+        valid = nav[:-1] > 0
         win = 5
-        for i in range(len(rets)):
-            window = rets[max(0, i - win + 1) : i + 1]
-            if window:
-                mu = sum(window) / len(window)
-                var = sum((r - mu) ** 2 for r in window) / len(window)
-                roll.append(math.sqrt(var))
-            else:
-                roll.append(0.0)
-        df_vol = pd.DataFrame({"step": range(1, len(nav_hist)), "vol": roll})
+        rets, roll, avg_ret, vol_total = _nav_analytics(nav, win)
+        avg_ret, vol_total = float(avg_ret), float(vol_total)
+        vol_idx, vol_pts = downsample(roll)
+        df_vol = pd.DataFrame({"step": np.arange(1, len(nav))[valid][vol_idx], "vol": vol_pts})
         st.write("Rolling Volatility (NAV)")
-        chart_vol = (
-            alt.Chart(df_vol)
-            .mark_line(color="#eab308")
-            .encode(x="step:Q", y="vol:Q")
-            .properties(height=260)
-        )
-        st.altair_chart(chart_vol, use_container_width=True)
-
-        avg_ret = sum(rets) / len(rets) if rets else 0.0
-        vol_total = (
-            (sum((r - avg_ret) ** 2 for r in rets) / len(rets)) ** 0.5 if rets else 0.0
-        )
+        chart_vol = line_spec("step:Q", "vol:Q", color="#eab308")
+        st.vega_lite_chart(df_vol, chart_vol, use_container_width=True)
+
         sharpe = (avg_ret / vol_total * (252 ** 0.5)) if vol_total > 0 else 0.0
         max_dd = _simple_drawdown(nav_hist)
 
@@ -21,14 +21,19 @@ if str(PROJECT_ROOT) not in sys.path:
 from agents.alpaca_mcp import AlpacaMCP
 from agents.llm_trader import LLMTrader
 
+@st.cache_resource(show_spinner=False)
+def _make_trader(api_key, secret_key):
+    """One MCP client + LLM trader per process, shared by all sessions"""
+    mcp = AlpacaMCP(api_key, secret_key, paper=True)
+    return LLMTrader(mcp), mcp
+
 def init_trader():
     """Initialize trader once"""
     if "trader_initialized" not in st.session_state:
         api_key = os.getenv('ALPACA_API_KEY', 'PKJQ4MG6LRX3YQWXHPUSBJ72UR')
         secret_key = os.getenv('ALPACA_SECRET_KEY', 'ERPjEteCfxbwhn1uEDoKGnQjNxksehTYGCvqmMZ6qEJZ')
 
-        mcp = AlpacaMCP(api_key, secret_key, paper=True)
-        trader = LLMTrader(mcp)
+        trader, mcp = _make_trader(api_key, secret_key)
 
         st.session_state.trader = trader
         st.session_state.mcp = mcp
@@ -36,17 +41,34 @@ def init_trader():
 
     return st.session_state.trader, st.session_state.mcp
 
+@st.cache_data(ttl=1.5, show_spinner=False)
+def _fetch_status(_mcp):
+    """Account + positions, coalesced across reruns for 1.5s"""
+    acct, positions = _mcp.get_account_and_positions()
+    return {"account": acct, "positions": positions}
+
+def mark_status_dirty():
+    """Account changed (trade placed): refetch on the next rerun"""
+    _fetch_status.clear()
+    st.session_state.status_dirty = True
+
 def update_status(mcp):
-    """Fetch fresh account data"""
+    """Fetch account data (coalesced by _fetch_status) and clear the dirty flag"""
     try:
-        acct = mcp.get_account()
-        positions = mcp.get_all_positions()
-        st.session_state.status = {"account": acct, "positions": positions}
+        st.session_state.status = _fetch_status(mcp)
+        st.session_state.status_dirty = False
         return True
     except Exception as e:
         st.error(f"Status error: {e}")
         return False
 
+POSITION_COLUMNS = ["symbol", "qty", "market_value", "unrealized_pl"]
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _positions_df(rows):
+    """Open-positions table from hashable (symbol, qty, value, P/L) rows"""
+    return pd.DataFrame(list(rows), columns=POSITION_COLUMNS)
+
 def show_status():
     """Display account metrics and positions"""
     status = st.session_state.get("status", {"account": {}, "positions": []})
@@ -61,9 +83,11 @@ def show_status():
         positions = status["positions"]
         if positions:
             st.subheader("📊 Open Positions")
-            df = pd.DataFrame(positions)
-            st.dataframe(df[["symbol", "qty", "market_value", "unrealized_pl"]],
-                        height=200, use_container_width=True)
+            df = _positions_df(tuple(
+                (p["symbol"], p["qty"], p["market_value"], p["unrealized_pl"])
+                for p in positions
+            ))
+            st.dataframe(df, height=200, use_container_width=True)
         else:
             st.info("📭 No open positions")
     else:
@@ -83,11 +107,14 @@ def render(api):
     with col1:
         if st.button("🔄 Refresh Account", type="secondary", use_container_width=True):
             with st.spinner("Refreshing..."):
+                # explicit refresh bypasses the shared short-lived status cache
+                mark_status_dirty()
                 if update_status(mcp):
                     st.success("✅ Updated!")
 
-        # Initialize status on first load
-        if "status" not in st.session_state:
+        # Fetch only on first load or after a trade; other reruns (chat,
+        # widget edits) redraw from the stored status
+        if st.session_state.get("status_dirty", True):
             update_status(mcp)
 
         show_status()
@@ -107,27 +134,28 @@ def render(api):
         with col_buy:
             if st.button("🟢 BUY", type="primary", use_container_width=True, key="buy_btn"):
                 with st.spinner(f"Buying {trade_qty} {trade_symbol}..."):
-                    result = trader.process_command(f"buy {trade_qty} {trade_symbol}")
+                    # action is already known: place the order, no command parsing
+                    result = mcp.buy(trade_symbol, trade_qty)
 
                     if result.get("success"):
                         st.success(f"✅ Bought {trade_qty} {trade_symbol}!")
                         st.balloons()
-                        update_status(mcp)
+                        mark_status_dirty()
                         st.rerun()
                     else:
-                        st.error(f"❌ {result.get('message', 'Failed')}")
+                        st.error(f"❌ {result.get('error', 'Failed')}")
 
         with col_sell:
             if st.button("🔴 SELL", type="secondary", use_container_width=True, key="sell_btn"):
                 with st.spinner(f"Selling {trade_qty} {trade_symbol}..."):
-                    result = trader.process_command(f"sell {trade_qty} {trade_symbol}")
+                    result = mcp.sell(trade_symbol, trade_qty)
 
                     if result.get("success"):
                         st.success(f"✅ Sold {trade_qty} {trade_symbol}!")
-                        update_status(mcp)
+                        mark_status_dirty()
                         st.rerun()
                     else:
-                        st.error(f"❌ {result.get('message', 'Failed')}")
+                        st.error(f"❌ {result.get('error', 'Failed')}")
 
         st.divider()
 
@@ -159,7 +187,7 @@ def render(api):
 
                 # Update status if trade was made
                 if result.get('action') in ['buy', 'sell']:
-                    update_status(mcp)
+                    mark_status_dirty()
 
             st.rerun()
 
@@ -1,7 +1,9 @@
 # frontend/pages/overview.py
 import streamlit as st
 import pandas as pd
-import altair as alt
+import numpy as np
+
+from charts import MAX_POINTS, arc_spec, bar_spec, lttb_indices
 
 
 PRIMARY = "#00b386"
@@ -14,29 +16,34 @@ def _growth_badge(value: float) -> str:
     return f"<span style='color:{color}; font-weight:600;'>{arrow} {value:.2f}%</span>"
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _alloc_df(positions, price, sip_total, cash):
+    """Allocation pie data (non-zero slices only) for (ticker, units) pairs."""
+    units = np.fromiter((u for _, u in positions), dtype=np.float64, count=len(positions))
+    eq_value = float(units.sum()) * price
+    df = pd.DataFrame(
+        {"asset": ["Equity / Index", "SIP", "Cash"], "value": [eq_value, sip_total, cash]}
+    )
+    return df[df["value"] > 0]
+
+
 def render(api):
     st.title("Portfolio Overview")
 
-    state = api("/state")
-    portfolio = api("/portfolio")
-    market = api("/market")
-    logs = api("/logs")
+    data = api("/dashboard?include=state,portfolio,market,logs&logs=1")
+    state, portfolio, market, logs = (
+        data["state"], data["portfolio"], data["market"], data["logs"]
+    )
 
     total_value = portfolio["value"]
     invested_amount = portfolio["invested_amount"]
     profit_abs = portfolio["absolute_profit_loss"]
     profit_pct = portfolio["percentage_profit_loss"]
     today_pl = portfolio["daily_profit_loss"]
-    today_pl_base = total_value - today_pl if total_value > today_pl else total_value
-    today_pl_pct = (today_pl / today_pl_base * 100.0) if today_pl_base > 0 else 0.0
+    today_pl_pct = portfolio["today_pl_pct"]
 
     sip_suggested = state.get("sip_suggested_amount", portfolio.get("sip_suggested_amount", 0.0))
-
-    if "last_sip_suggestion" not in st.session_state:
-        st.session_state["last_sip_suggestion"] = sip_suggested
-    delta_sip = sip_suggested - st.session_state["last_sip_suggestion"]
-    st.session_state["last_sip_suggestion"] = sip_suggested
-    sip_delta_pct = (delta_sip / abs(sip_suggested) * 100.0) if sip_suggested else 0.0
+    sip_delta_pct = state["sip_delta_pct"]
 
     st.markdown(
         """
@@ -82,46 +89,31 @@ def render(api):
         positions = portfolio.get("positions", {}) or {}
         current_price = market["current_price"]
 
-        eq_value = sum(units * current_price for t, units in positions.items())
-        sip_total = sum(market["sip_history"]) if market["sip_history"] else 0.0
-        cash_value = bank_balance
-
-        alloc_data = [
-            {"asset": "Equity / Index", "value": eq_value},
-            {"asset": "SIP", "value": sip_total},
-            {"asset": "Cash", "value": cash_value},
-        ]
-        df_alloc = pd.DataFrame(alloc_data)
-        df_alloc = df_alloc[df_alloc["value"] > 0]
+        sip_total = float(np.asarray(market["sip_history"], dtype=np.float64).sum())
+        df_alloc = _alloc_df(
+            tuple(sorted(positions.items())), current_price, sip_total, bank_balance
+        )
 
         if not df_alloc.empty:
-            chart_alloc = (
-                alt.Chart(df_alloc)
-                .mark_arc(outerRadius=110)
-                .encode(theta="value:Q", color="asset:N")
-            )
-            st.altair_chart(chart_alloc, use_container_width=True)
+            chart_alloc = arc_spec("value:Q", "asset:N", outer_radius=110)
+            st.vega_lite_chart(df_alloc, chart_alloc, use_container_width=True)
 
         income_hist = market["income_history"]
         expense_hist = market["expense_history"]
         if income_hist and expense_hist:
-            steps = list(range(max(len(income_hist), len(expense_hist))))
-            df_flow = pd.DataFrame(
-                {
-                    "step": steps,
-                    "Inflow": income_hist + [0.0] * (len(steps) - len(income_hist)),
-                    "Outflow": expense_hist + [0.0] * (len(steps) - len(expense_hist)),
-                }
-            )
+            n = max(len(income_hist), len(expense_hist))
+            inflow = np.pad(np.asarray(income_hist, dtype=np.float64), (0, n - len(income_hist)))
+            outflow = np.pad(np.asarray(expense_hist, dtype=np.float64), (0, n - len(expense_hist)))
+            df_flow = pd.DataFrame({"step": np.arange(n), "Inflow": inflow, "Outflow": outflow})
+            if len(df_flow) > MAX_POINTS:
+                keep = np.union1d(
+                    lttb_indices(df_flow["Inflow"]), lttb_indices(df_flow["Outflow"])
+                )
+                df_flow = df_flow.iloc[keep]
             df_m = df_flow.melt(id_vars="step", var_name="type", value_name="amount")
             st.subheader("Net Inflow / Outflow")
-            chart_flow = (
-                alt.Chart(df_m)
-                .mark_bar()
-                .encode(x="step:O", y="amount:Q", color="type:N")
-                .properties(height=260)
-            )
-            st.altair_chart(chart_flow, use_container_width=True)
+            chart_flow = bar_spec("step:O", "amount:Q", color_field="type:N")
+            st.vega_lite_chart(df_m, chart_flow, use_container_width=True)
 
     # ---- Right: Agent Insights ----
     with right:
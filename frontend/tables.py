@@ -0,0 +1,25 @@
+# frontend/tables.py
+"""
+Typed DataFrames for tables shared across pages.
+"""
+import streamlit as st
+import pandas as pd
+
+TX_COLUMNS = ["id", "timestamp", "type", "category", "amount", "description", "balance_after"]
+TX_DTYPES = {
+    "id": "int64",
+    "type": "category",
+    "category": "category",
+    "amount": "float64",
+    "description": "string",
+    "balance_after": "float64",
+}
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def transactions_df(txs):
+    """/transactions rows projected onto TX_COLUMNS with explicit dtypes."""
+    df = pd.DataFrame(txs, columns=TX_COLUMNS)
+    # timestamps mix plain dates (manual entries) and full ISO datetimes
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    return df.astype(TX_DTYPES, errors="ignore")